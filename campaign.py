@@ -0,0 +1,445 @@
+import argparse
+import functools
+import itertools
+import multiprocessing
+import os
+import queue
+import time
+
+import numpy as np
+
+from models.convolutional_model import ConvolutionalModel
+from models.simple_model import SimpleModel
+from moo.batch_attack import BatchAttack
+from moo.checkpoint import Checkpoint, save_npz
+from moo.encodings import DctEncoding, GridEncoding, SparseEncoding
+from moo.islands import IslandModel
+from moo.nsga2 import NSGA2
+from moo.observers import JsonLinesObserver, ProfilingObserver
+from moo.problem.executors import (BatchingExecutor, InferenceServer,
+                                   ProcessExecutor, RemoteExecutor,
+                                   ThreadExecutor)
+from moo.problem.improved_targeted_attack import ImprovedTargetedAttack
+from moo.problem.simple_attack import SimpleAttack
+from moo.problem.targeted_attack import TargetedAttack
+from moo.refinement import GradientRefinement
+from moo.spea2 import SPEA2
+from moo.steady_state import SteadyStateNSGA2, SteadyStateSPEA2
+from moo.stopping import (AttackSucceeded, EvaluationBudget,
+                          HypervolumeStagnation, TimeBudget)
+
+MODELS = {'simple_model': SimpleModel,
+          'convolutional_model': ConvolutionalModel}
+
+ENCODINGS = {'sparse': SparseEncoding, 'grid': GridEncoding,
+             'dct': DctEncoding}
+
+TARGET_LABEL = 3
+
+CLASSIFY_CHUNK_SIZE = 1000
+
+# the max number of groups queued per worker process
+GROUPS_PER_WORKER = 2
+
+_args = None
+_attack = None
+
+
+def init_attack(args, server=None):
+    """
+    Initializes objects based on the given command-line arguments.
+
+    :param server: the address & authentication key of the InferenceServer
+                   used by the 'server' executor
+    :return: a tuple of the model and a list of args.lockstep algorithms,
+             each with its own problem, that attack the model in lockstep
+    """
+    model = load_model(args)
+    executor = init_executor(args, model, server)
+
+    algorithms = [init_algorithm(args, model, executor)
+                  for _ in range(args.lockstep)]
+
+    return model, algorithms
+
+
+def load_model(args):
+    """Returns the attacked model with its weights loaded."""
+    model = MODELS[args.model](backend=args.backend)
+    model.load(args.weights)
+
+    return model
+
+
+def init_executor(args, model, server=None):
+    """Returns the Executor running the model inference of the attacks, or
+    None if the model is called directly."""
+    if args.executor == 'threads':
+        return ThreadExecutor(model, args.executor_workers)
+    if args.executor == 'processes':
+        return ProcessExecutor(model, args.executor_workers)
+    if args.executor == 'server':
+        return RemoteExecutor(*server)
+
+    return None
+
+
+def close_attack(attack):
+    """Closes the executor used by the problems of the given attack and stops
+    the processes of island models."""
+    executor = attack[1][0].problem.executor
+
+    if executor is not None:
+        executor.close()
+
+    for algorithm in attack[1]:
+        if isinstance(algorithm, IslandModel):
+            algorithm.close()
+
+
+def init_algorithm(args, model, executor=None):
+    """Initializes an algorithm attacking the given model."""
+    if args.attack_type == 'simple_attack':
+        problem_class = SimpleAttack
+    elif args.attack_type == 'targeted_attack':
+        problem_class = TargetedAttack
+    else:
+        problem_class = ImprovedTargetedAttack
+
+    encoding = None
+
+    if args.encoding != 'dense':
+        encoding = ENCODINGS[args.encoding](model.INPUT_SHAPE, args.noise_size,
+                                            args.encoding_size)
+
+    problem = problem_class(model, args.noise_size, args.batchsize,
+                            args.cachesize, encoding, executor)
+
+    if args.islands > 1:
+        return IslandModel(problem, functools.partial(init_island, args),
+                           args.islands, args.migration_interval,
+                           args.migrants)
+
+    observers = []
+
+    if args.stats:
+        observers.append(JsonLinesObserver(args.stats))
+    if args.profile:
+        observers.append(ProfilingObserver(args.profile))
+
+    stopping_criteria = []
+
+    if args.stop_noise is not None:
+        stopping_criteria.append(AttackSucceeded(args.stop_noise))
+    if args.stagnation is not None:
+        stopping_criteria.append(HypervolumeStagnation(args.stagnation,
+                                                       args.stagnation_tol))
+    if args.time_budget is not None:
+        stopping_criteria.append(TimeBudget(args.time_budget))
+    if args.eval_budget is not None:
+        stopping_criteria.append(EvaluationBudget(args.eval_budget))
+
+    refinement = None
+
+    if args.gradient_steps:
+        refinement = GradientRefinement(args.gradient_fraction,
+                                        args.gradient_steps,
+                                        args.gradient_step_size)
+
+    if args.steady_state and args.algorithm == 'nsga2':
+        return SteadyStateNSGA2(problem, args.popsize, args.maxiter,
+                                observers, stopping_criteria=stopping_criteria,
+                                archive_front=args.archive_front,
+                                refinement=refinement,
+                                offspring_size=args.steady_state,
+                                max_pending=args.pending,
+                                tile_size=args.tile_size)
+
+    if args.steady_state:
+        return SteadyStateSPEA2(problem, args.popsize, args.popsize,
+                                args.maxiter, observers,
+                                stopping_criteria=stopping_criteria,
+                                archive_front=args.archive_front,
+                                refinement=refinement,
+                                offspring_size=args.steady_state,
+                                max_pending=args.pending)
+
+    if args.algorithm == 'nsga2':
+        return NSGA2(problem, args.popsize, args.maxiter, observers,
+                     stopping_criteria=stopping_criteria,
+                     archive_front=args.archive_front, refinement=refinement,
+                     tile_size=args.tile_size)
+
+    return SPEA2(problem, args.popsize, args.popsize, args.maxiter, observers,
+                 stopping_criteria=stopping_criteria,
+                 archive_front=args.archive_front, refinement=refinement,
+                 tile_size=args.tile_size)
+
+
+def init_island(args):
+    """Loads the model & initializes the algorithm of an island process."""
+    island_args = argparse.Namespace(**{**vars(args), 'islands': 1})
+
+    return init_algorithm(island_args, load_model(args))
+
+
+def sample_seed(seed, sample_idx):
+    """Returns the seed used for attacking the sample with the given index."""
+    return int(np.random.SeedSequence([seed, sample_idx]).generate_state(1)[0])
+
+
+def attack_samples(tasks):
+    """
+    Attacks a group of samples in lockstep with the algorithms of the current
+    process.
+
+    :param tasks: a list of tuples of the sample index, image, label, the
+                  model's predictions for the image and the seed, at most
+                  one per algorithm
+    :return: a list of tuples of the sample index, the original image, a list
+             of (CSV line, perturbation, objectives) tuples or None if the
+             sample was skipped, and the wall time spent on the group, one
+             per task
+    """
+    algorithms = _attack[1]
+
+    start = time.perf_counter()
+    attacks = []
+
+    for (sample_idx, orig_image, orig_label, probs, seed), algorithm in zip(
+            tasks, algorithms):
+        if orig_label != np.argmax(probs):
+            continue
+
+        if isinstance(algorithm.problem, SimpleAttack):
+            label = orig_label
+        else:
+            if orig_label == TARGET_LABEL:
+                continue
+            label = TARGET_LABEL
+
+        algorithm.rng = np.random.default_rng(seed)
+        algorithm.problem.reset_o_extremes()
+
+        for observer in algorithm.observers:
+            observer.tags['sample_idx'] = sample_idx
+
+        if _args.checkpoint_dir:
+            algorithm.checkpoint = Checkpoint(
+                checkpoint_path(_args.checkpoint_dir, sample_idx),
+                _args.checkpoint_every)
+
+            if not _args.resume:
+                algorithm.checkpoint.remove()
+
+        attacks.append((algorithm, sample_idx, orig_image, orig_label,
+                        probs[orig_label], label))
+
+    fronts = BatchAttack([attack[0] for attack in attacks]).run(
+        [attack[2] for attack in attacks], [attack[5] for attack in attacks])
+    rows = {}
+
+    for (algorithm, sample_idx, orig_image, orig_label, orig_prob, label), \
+            results in zip(attacks, fronts):
+        # the checkpoint is kept until the sample is recorded as finished
+        # (see remove_checkpoints), so an interrupted campaign resumes it
+        algorithm.checkpoint = None
+
+        rows[sample_idx] = []
+
+        perturbations = algorithm.problem.perturbations(results.variables,
+                                                        orig_image)
+
+        # the predictions of the adversarial images were stored by their
+        # last evaluation, so the final front needs no inference
+        adv_labels = np.argmax(results.predictions, axis=1)
+        successes = algorithm.problem.is_successful(results.predictions,
+                                                    label)
+
+        for perturbation, objectives, adv_probs, adv_label, succ in zip(
+                perturbations, results.objectives, results.predictions,
+                adv_labels, successes):
+            line = [sample_idx, orig_label, orig_prob, adv_label,
+                    adv_probs[adv_label], adv_probs[orig_label],
+                    objectives[0], objectives[1], succ, algorithm.iterations,
+                    algorithm.stop_reason]
+            rows[sample_idx].append((line, perturbation, objectives))
+
+    wall_time = time.perf_counter() - start
+
+    return [(sample_idx, orig_image, rows.get(sample_idx), wall_time)
+            for sample_idx, orig_image, *_ in tasks]
+
+
+def _init_worker(args, server=None):
+    """Loads the model & initializes the attack of a worker process."""
+    global _args, _attack
+    _args = args
+    _attack = init_attack(args, server)
+
+
+def load_progress(checkpoint_dir):
+    """Returns the set of indices of samples finished in earlier runs of the
+    campaign checkpointed to the given directory."""
+    path = os.path.join(checkpoint_dir, 'campaign.npz')
+
+    if not os.path.exists(path):
+        return set()
+
+    with np.load(path) as data:
+        return set(data['finished'].tolist())
+
+
+def save_progress(checkpoint_dir, finished):
+    """Saves the set of indices of finished samples to the given checkpoint
+    directory."""
+    save_npz(os.path.join(checkpoint_dir, 'campaign.npz'),
+             finished=np.array(sorted(finished), dtype='int64'))
+
+
+def checkpoint_path(checkpoint_dir, sample_idx):
+    """Returns the path of the checkpoint of the given sample's attack."""
+    return os.path.join(checkpoint_dir, f'sample{sample_idx}.npz')
+
+
+def remove_checkpoints(checkpoint_dir, sample_indices):
+    """Removes the checkpoints of the attacks of the given samples, which
+    must already be saved as finished."""
+    for sample_idx in sample_indices:
+        Checkpoint(checkpoint_path(checkpoint_dir, sample_idx)).remove()
+
+
+def classify_samples(model, samples, batch_size=None,
+                     chunk_size=CLASSIFY_CHUNK_SIZE):
+    """
+    Classifies the given samples in batched passes, one per chunk of
+    chunk_size samples, so a stream of samples is classified lazily.
+
+    :param model: the model classifying the samples
+    :param samples: an iterable of (sample index, image, label) tuples
+    :param batch_size: the max number of images per forward pass
+    :return: a generator of (sample index, image, label, predictions) tuples
+    """
+    samples = iter(samples)
+
+    while True:
+        chunk = list(itertools.islice(samples, chunk_size))
+
+        if not chunk:
+            return
+
+        predictions = model.predict_batch(
+            np.stack([image for _, image, _ in chunk]), batch_size)
+
+        for (sample_idx, image, label), probs in zip(chunk, predictions):
+            yield sample_idx, image, label, probs
+
+
+def _groups(args, model, samples, finished):
+    """Returns a generator of the lockstep groups of attack_samples tasks of
+    the unfinished samples, which are classified by the given model."""
+    tasks = ((sample_idx, orig_image, orig_label, probs,
+              sample_seed(args.seed, sample_idx))
+             for sample_idx, orig_image, orig_label, probs in classify_samples(
+                 model, (sample for sample in samples
+                         if sample[0] not in finished), args.batchsize))
+
+    return iter(lambda: list(itertools.islice(tasks, args.lockstep)), [])
+
+
+def _imap_bounded(pool, function, iterable, max_pending):
+    """
+    Applies a function to the items of an iterable in a process pool, like
+    Pool.imap_unordered, but takes at most max_pending items from the
+    iterable before their results are consumed, so a lazy iterable is not
+    drained into the pool's task queue.
+
+    :return: a generator of the results in order of completion
+    """
+    results = queue.Queue()
+    pending = 0
+
+    def next_result():
+        """Waits for the next result and re-raises errors of the function."""
+        result, error = results.get()
+
+        if error is not None:
+            raise error
+
+        return result
+
+    for item in iterable:
+        pool.apply_async(function, (item,),
+                         callback=lambda result: results.put((result, None)),
+                         error_callback=lambda error: results.put((None,
+                                                                   error)))
+        pending += 1
+
+        if pending == max_pending:
+            pending -= 1
+            yield next_result()
+
+    for _ in range(pending):
+        yield next_result()
+
+
+def run_campaign(args, samples, finished=()):
+    """
+    Attacks the given samples in groups of args.lockstep samples attacked in
+    lockstep, spreading the groups across args.workers processes.
+
+    Each worker loads its own model. With the 'server' executor, the
+    inference of all workers is run by an InferenceServer started by this
+    process, which merges the batches of concurrently running attacks. Every
+    sample is attacked with a seed derived from args.seed and the sample
+    index, so results do not depend on the number of workers, the group size
+    or the order in which samples are processed.
+
+    The samples are consumed lazily, so a stream of samples read from a
+    memory-mapped dataset is attacked without loading it first. At most
+    GROUPS_PER_WORKER groups per worker are queued at once. Before they
+    are attacked, the samples are classified by this process in batched
+    passes (see classify_samples), so the workers skip misclassified samples
+    without running the model.
+
+    :param args: the parsed command-line arguments
+    :param samples: an iterable of (sample index, image, label) tuples, e.g.
+                    a util.stratified_samples generator
+    :param finished: the indices of samples to skip, e.g. finished before
+                     the campaign was interrupted
+    :return: a generator of attack_samples results in order of completion
+    """
+    server = None
+
+    if args.executor == 'server':
+        server = InferenceServer(BatchingExecutor(load_model(args),
+                                                  args.batchsize))
+
+    try:
+        address = (server.address, server.authkey) if server else None
+
+        if args.workers == 1:
+            _init_worker(args, address)
+
+            try:
+                for results in map(attack_samples, _groups(
+                        args, _attack[0], samples, finished)):
+                    yield from results
+            finally:
+                close_attack(_attack)
+            return
+
+        model = server.executor.model if server else load_model(args)
+        context = multiprocessing.get_context('spawn')
+
+        with context.Pool(args.workers, _init_worker,
+                          (args, address)) as pool:
+            for results in _imap_bounded(
+                    pool, attack_samples,
+                    _groups(args, model, samples, finished),
+                    GROUPS_PER_WORKER * args.workers):
+                yield from results
+    finally:
+        if server is not None:
+            server.close()
+            server.executor.close()
@@ -1,20 +1,16 @@
 import argparse
-import csv
+import functools
+import os
+import sys
+import time
 
 import numpy as np
-from PIL import Image
-from keras.datasets import mnist
-from matplotlib import pyplot as plt
 
 import util
-from models.convolutional_model import ConvolutionalModel
-from models.simple_model import SimpleModel
-from moo.nsga2 import NSGA2
-from moo.problem.improved_targeted_attack import ImprovedTargetedAttack
-from moo.problem.simple_attack import SimpleAttack
-from moo.problem.targeted_attack import TargetedAttack
-from moo.spea2 import SPEA2
-from util import load_mnist
+from campaign import (MODELS, load_progress, remove_checkpoints,
+                      run_campaign, save_progress)
+from results import ResultStore, export_images
+from util import load_mnist_test
 
 
 def parse_args():
@@ -37,103 +33,200 @@ def parse_args():
                         help='the max number of algorithm iterations')
     parser.add_argument('--popsize', type=int, default=100,
                         help='the size of the population')
-
-    return parser.parse_args()
-
-
-def init_attack(args):
-    """Initializes objects based on the given command-line arguments."""
-    if args.model == 'simple_model':
-        model = SimpleModel()
-    else:
-        model = ConvolutionalModel()
-    model.load(args.weights)
-
-    if args.attack_type == 'simple_attack':
-        problem = SimpleAttack(model, args.noise_size)
-    elif args.attack_type == 'targeted_attack':
-        problem = TargetedAttack(model, args.noise_size)
-    else:
-        problem = ImprovedTargetedAttack(model, args.noise_size)
-
-    if args.algorithm == 'nsga2':
-        algorithm = NSGA2(problem, args.popsize, args.maxiter)
-    else:
-        algorithm = SPEA2(problem, args.popsize, args.popsize, args.maxiter)
-
-    return model, problem, algorithm
-
-
-def plot_objectives(front):
-    """Plots 2D objectives of solutions in the given front."""
-    label_probability = [solution.objectives[0] for solution in front]
-    noise_strength = [solution.objectives[1] for solution in front]
-
-    plt.scatter(noise_strength, label_probability)
+    parser.add_argument('--islands', type=int, default=1,
+                        help='the number of islands evolving separate '
+                             'populations in parallel processes')
+    parser.add_argument('--migration-interval', type=int, default=5,
+                        help='the number of generations between migrations '
+                             'of solutions between islands')
+    parser.add_argument('--migrants', type=int, default=5,
+                        help='the max number of solutions an island sends '
+                             'per migration')
+    parser.add_argument('--steady-state', type=int, default=None,
+                        metavar='OFFSPRING',
+                        help='evolve steady-state populations, inserting '
+                             'batches of OFFSPRING solutions as soon as they '
+                             'are evaluated')
+    parser.add_argument('--pending', type=int, default=1,
+                        help='the max number of steady-state offspring '
+                             'batches evaluated concurrently')
+    parser.add_argument('--tile-size', type=int, default=None,
+                        help='compute domination & distance matrices in '
+                             'tiles of TILE_SIZE rows to bound the memory '
+                             'used by large populations')
+    parser.add_argument('--archive-front', action='store_true',
+                        help='return every non-dominated solution found '
+                             'during a run, not only those of the final '
+                             'population')
+    parser.add_argument('--stop-noise', type=float, default=None,
+                        help='stop once an attack succeeds with at most this '
+                             'noise strength')
+    parser.add_argument('--stagnation', type=int, default=None,
+                        help='stop once the hypervolume stagnates for this '
+                             'many iterations')
+    parser.add_argument('--stagnation-tol', type=float, default=1e-4,
+                        help='the smallest relative hypervolume improvement '
+                             'not considered stagnation')
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help='the max number of seconds spent on a sample')
+    parser.add_argument('--eval-budget', type=int, default=None,
+                        help='the max number of evaluations spent on a sample')
+    parser.add_argument('--encoding', default='dense',
+                        choices=['dense', 'sparse', 'grid', 'dct'],
+                        help='the encoding of perturbations')
+    parser.add_argument('--encoding-size', type=int, default=7,
+                        help='the number of perturbed pixels (sparse), or '
+                             'of grid cells (grid) or DCT coefficients (dct) '
+                             'along each image axis')
+    parser.add_argument('--gradient-steps', type=int, default=0,
+                        help='the number of signed-gradient steps taken by '
+                             'refined offspring (0 disables refinement)')
+    parser.add_argument('--gradient-fraction', type=float, default=0.1,
+                        help='the fraction of offspring refined by gradient '
+                             'steps')
+    parser.add_argument('--gradient-step-size', type=float, default=0.25,
+                        help='the size of a gradient step relative to the '
+                             'noise size (or the bounds of encoded variables)')
+    parser.add_argument('--backend', choices=['keras', 'numpy'],
+                        default='keras',
+                        help='the backend used for model inference')
+    parser.add_argument('--batchsize', type=int, default=None,
+                        help='the max number of images per model forward pass')
+    parser.add_argument('--cachesize', type=int, default=None,
+                        help='the max number of cached model predictions')
+    parser.add_argument('--executor', default='serial',
+                        choices=['serial', 'threads', 'processes', 'server'],
+                        help='how model inference is run - in the attacking '
+                             'process, split across threads or processes, '
+                             'or by a local inference server shared by all '
+                             'workers')
+    parser.add_argument('--executor-workers', type=int, default=None,
+                        help='the number of inference threads or processes '
+                             '(the number of CPUs by default)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='the number of worker processes')
+    parser.add_argument('--lockstep', type=int, default=1,
+                        help='the number of samples attacked in lockstep, '
+                             'sharing model forward passes')
+    parser.add_argument('--samples-per-label', type=int, default=3,
+                        help='the number of random MNIST test samples '
+                             'attacked per label (0 for the whole test set)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='the seed used for attacking samples')
+    parser.add_argument('--checkpoint-dir', default=None,
+                        help='a directory to save checkpoints to')
+    parser.add_argument('--checkpoint-every', type=int, default=10,
+                        help='the number of iterations between checkpoints')
+    parser.add_argument('--resume', action='store_true',
+                        help='resume the campaign from the checkpoints')
+    parser.add_argument('--stats', default=None,
+                        help='a JSON lines file to append generation stats to')
+    parser.add_argument('--profile', default=None,
+                        help='a cProfile dump path pattern, e.g. '
+                             'profile_{sample_idx}.prof')
+    parser.add_argument('--output-dir', default='results',
+                        help='the directory to store the results in')
+    parser.add_argument('--shard-size', type=int, default=1000,
+                        help='the min number of solutions per results shard')
+    parser.add_argument('--png', action='store_true',
+                        help='export the stored results as PNG images')
+    parser.add_argument('--plot', action='store_true',
+                        help='plot the objectives of each final front')
+
+    args = parser.parse_args()
+
+    if args.lockstep > 1 and args.profile:
+        parser.error('--profile cannot be combined with --lockstep')
+    if args.resume and not args.checkpoint_dir:
+        parser.error('--resume requires --checkpoint-dir')
+    if args.executor == 'processes' and args.backend != 'numpy':
+        parser.error('--executor processes requires --backend numpy')
+    if args.executor == 'processes' and args.workers > 1:
+        parser.error('--executor processes cannot be combined with --workers')
+    if args.steady_state and args.lockstep > 1:
+        parser.error('--steady-state cannot be combined with --lockstep')
+    if args.steady_state and args.tile_size and args.algorithm == 'spea2':
+        parser.error('--tile-size cannot be combined with --steady-state '
+                     'for spea2')
+    if args.islands > 1:
+        for name in ('workers', 'lockstep'):
+            if getattr(args, name) > 1:
+                parser.error(f'--islands cannot be combined with --{name}')
+        for name in ('checkpoint_dir', 'stats', 'profile'):
+            if getattr(args, name):
+                parser.error(f'--islands cannot be combined with '
+                             f'--{name.replace("_", "-")}')
+        if args.executor != 'serial':
+            parser.error('--islands cannot be combined with --executor')
+
+    return args
+
+
+def plot_objectives(objectives):
+    """Plots 2D objectives of solutions in a front."""
+    from matplotlib import pyplot as plt
+
+    plt.scatter(objectives[:, 1], objectives[:, 0])
     plt.xlabel('noise strength')
     plt.ylabel('label probability')
     plt.show()
 
 
-def save_image(array, filename):
-    """Saves the given array as an image."""
-    array = (array * 255).reshape(28, 28).astype('uint8')
-    Image.fromarray(array, 'L').save(filename)
+def record_progress(checkpoint_dir, finished, sample_indices):
+    """Adds the given samples to the finished ones, saves the progress of
+    the campaign and removes the samples' checkpoints, which are no longer
+    needed to resume it."""
+    finished.update(sample_indices)
+    save_progress(checkpoint_dir, finished)
+    remove_checkpoints(checkpoint_dir, sample_indices)
 
 
 if __name__ == '__main__':
     header = ['sample_idx', 'orig_label', 'orig_prob', 'adv_label', 'adv_prob',
-              'adv_orig_prob', 'obj_0', 'obj_1', 'succ']
-    target_label = 3
-
-    model, problem, algorithm = init_attack(parse_args())
+              'adv_orig_prob', 'obj_0', 'obj_1', 'succ', 'generations',
+              'stop_reason']
 
-    x_test = load_mnist(model.INPUT_SHAPE, model.NUM_OUTPUTS)[2]
-    y_test = mnist.load_data()[1][1]
-    x_rand, y_rand = util.sample_choice(x_test, y_test, range(10), 3, seed=43)
+    args = parse_args()
+    x_test, y_test = load_mnist_test(MODELS[args.model].INPUT_SHAPE)
+    samples = util.stratified_samples(x_test, y_test, range(10),
+                                      args.samples_per_label or None, seed=43)
 
-    csv_file = open('data.csv', 'w', newline='')
-    csv_writer = csv.writer(csv_file)
-    csv_writer.writerow(header)
+    finished = set()
+    on_flush = None
 
-    print(','.join(header))
+    if args.checkpoint_dir:
+        os.makedirs(args.checkpoint_dir, exist_ok=True)
 
-    for sample_idx, (orig_image, orig_label) in enumerate(zip(x_rand, y_rand)):
-        probs = model.predict(orig_image)
-        orig_prob = probs[orig_label]
+        if args.resume:
+            finished = load_progress(args.checkpoint_dir)
 
-        if orig_label != np.argmax(probs):
-            continue
+        on_flush = functools.partial(record_progress, args.checkpoint_dir,
+                                     finished)
 
-        if isinstance(problem, SimpleAttack):
-            label = orig_label
-        else:
-            if orig_label == target_label:
-                continue
-            label = target_label
-
-        save_image(orig_image, filename=f'sample{sample_idx}_orig.png')
+    store = ResultStore(args.output_dir, header, args.shard_size,
+                        append=args.resume, on_flush=on_flush)
 
-        results = algorithm.run(orig_image, label)
-        # plot_objectives(results)
+    start = time.perf_counter()
 
-        for adv_idx, solution in enumerate(results):
-            adv_image = orig_image + solution.variables
-            adv_probs = model.predict(adv_image)
-            adv_label = np.argmax(adv_probs)
+    for sample_idx, orig_image, rows, wall_time in run_campaign(
+            args, samples, finished):
+        if rows is None:
+            print(f'sample {sample_idx} skipped', file=sys.stderr)
+        else:
+            successes = sum(line[8] for line, _, _ in rows)
+            print(f'sample {sample_idx} finished in {wall_time:.2f}s '
+                  f'({len(rows)} solutions, {successes} successful)',
+                  file=sys.stderr)
 
-            if isinstance(problem, SimpleAttack):
-                succ = adv_label != orig_label
-            else:
-                succ = adv_label == target_label
+            if args.plot:
+                plot_objectives(np.array([line[6:8] for line, _, _ in rows]))
 
-            save_image(adv_image, filename=f'sample{sample_idx}_{adv_idx}.png')
+        store.add(sample_idx, orig_image, rows)
 
-            line = [sample_idx, orig_label, orig_prob, adv_label,
-                    adv_probs[adv_label], adv_probs[orig_label],
-                    solution.objectives[0], solution.objectives[1], succ]
-            csv_writer.writerow(line)
+    store.close()
 
-            print(','.join(str(e) for e in line))
+    print(f'campaign finished in {time.perf_counter() - start:.2f}s',
+          file=sys.stderr)
 
-    csv_file.close()
+    if args.png:
+        export_images(args.output_dir)
@@ -6,6 +6,7 @@ from typing import ClassVar
 import numpy as np
 
 import util
+from models.numpy_network import NumpyNetwork
 
 
 class AttackModel(ABC):
@@ -13,17 +14,30 @@ class AttackModel(ABC):
     LOSS: ClassVar[str]
     OPTIMIZER: ClassVar[str]
 
-    def __init__(self, layer_sizes, activations):
+    def __init__(self, layer_sizes, activations, backend='keras'):
         """
         Inits AttackModel attributes.
 
+        The 'numpy' backend runs inference with NumpyNetwork, without
+        importing Keras. It can only be used to load weights, predict and
+        compute input gradients.
+
         :param layer_sizes: a tuple of hidden layer & output layer sizes
         :param activations: a tuple of activation functions for each layer
+        :param backend: the backend to use - 'keras' or 'numpy'
         """
+        if backend not in ('keras', 'numpy'):
+            raise ValueError(f'unknown backend: {backend}')
+
         self.layer_sizes = layer_sizes
         self.activations = activations
+        self.backend = backend
+
+        if backend == 'keras':
+            self.model = self._build()
+        else:
+            self.model = NumpyNetwork(activations)
 
-        self.model = self._build()
         self.model.summary()
 
     @abstractmethod
@@ -38,6 +52,8 @@ class AttackModel(ABC):
         :param epochs: the number of epochs
         :param batch_size: the batch size
         """
+        self._require_keras('training')
+
         x_train, y_train, x_test, y_test = data
 
         self.model.compile(loss=self.LOSS, optimizer=self.OPTIMIZER,
@@ -55,8 +71,62 @@ class AttackModel(ABC):
         """Returns the predictions obtained for the given data."""
         return self.model.predict(np.array([data]))[0]
 
+    def predict_batch(self, data, batch_size=None):
+        """
+        Returns the predictions obtained for the given batch of data.
+
+        :param data: the model inputs stacked along the first axis
+        :param batch_size: the max number of inputs per forward pass (all
+                           inputs are passed at once if None)
+        :return: the predictions, one row per input
+        """
+        data = np.asarray(data)
+
+        if batch_size is None:
+            batch_size = max(len(data), 1)
+
+        return self.model.predict(data, batch_size=batch_size)
+
+    def gradient_batch(self, data, output_weights, batch_size=None):
+        """
+        Returns the gradients of a weighted sum of the predictions with
+        respect to the given batch of data, e.g. of a label's probability.
+
+        :param data: the model inputs stacked along the first axis
+        :param output_weights: the weights of the predictions in the sum
+        :param batch_size: the max number of inputs per pass (all inputs are
+                           passed at once if None)
+        :return: the gradients, one per input
+        """
+        data = np.asarray(data, dtype='float32')
+
+        if self.backend == 'numpy':
+            return self.model.gradient(data, output_weights, batch_size)
+
+        import tensorflow as tf
+
+        if batch_size is None:
+            batch_size = max(len(data), 1)
+
+        output_weights = tf.constant(output_weights, dtype='float32')
+        gradients = []
+
+        for i in range(0, len(data), batch_size):
+            inputs = tf.constant(data[i:i + batch_size])
+
+            with tf.GradientTape() as tape:
+                tape.watch(inputs)
+                objective = tf.reduce_sum(
+                    self.model(inputs, training=False) * output_weights)
+
+            gradients.append(tape.gradient(objective, inputs).numpy())
+
+        return np.concatenate(gradients) if gradients else data.copy()
+
     def save(self, weights_path=None):
         """Saves this model's weights to the specified path."""
+        self._require_keras('saving')
+
         if weights_path is None:
             weights_path = (f'trained/{type(self).__name__}'
                             f'{time.strftime("%Y-%m-%d-%H-%M-%S")}.h5')
@@ -66,5 +136,12 @@ class AttackModel(ABC):
     def load(self, weights_path):
         """Compiles this model using weights loaded from the specified path."""
         self.model.load_weights(weights_path)
-        self.model.compile(loss=self.LOSS, optimizer=self.OPTIMIZER,
-                           metrics=['accuracy'])
+
+        if self.backend == 'keras':
+            self.model.compile(loss=self.LOSS, optimizer=self.OPTIMIZER,
+                               metrics=['accuracy'])
+
+    def _require_keras(self, action):
+        """Raises an error if this model does not use the keras backend."""
+        if self.backend != 'keras':
+            raise NotImplementedError(f'{action} requires the keras backend')
@@ -1,7 +1,3 @@
-from keras.layers import Dense, Activation, Conv2D, Flatten, Dropout, \
-    MaxPooling2D
-from keras.models import Sequential
-
 import util
 from models.attack_model import AttackModel
 
@@ -15,17 +11,23 @@ class ConvolutionalModel(AttackModel):
     NUM_OUTPUTS = 10
 
     def __init__(self, layer_sizes=(32, 32, 64, 64, 128, 10),
-                 activations=('relu', 'relu', 'relu', 'relu', 'relu', 'softmax')):
+                 activations=('relu', 'relu', 'relu', 'relu', 'relu', 'softmax'),
+                 backend='keras'):
         """
         Inits ConvolutionalModel attributes.
 
         :param layer_sizes: a tuple of hidden and output layer sizes
         :param activations: a tuple of activation functions for each layer
+        :param backend: the backend to use - 'keras' or 'numpy'
         """
-        super().__init__(layer_sizes, activations)
+        super().__init__(layer_sizes, activations, backend)
 
     def _build(self):
         """Builds this model."""
+        from keras.layers import Dense, Activation, Conv2D, Flatten, \
+            Dropout, MaxPooling2D
+        from keras.models import Sequential
+
         model = Sequential()
 
         model.add(Conv2D(self.layer_sizes[0], 3, input_shape=self.INPUT_SHAPE))
@@ -0,0 +1,246 @@
+import re
+
+import numpy as np
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0),
+    'sigmoid': lambda x: 1 / (1 + np.exp(-x)),
+    'tanh': np.tanh,
+}
+
+
+def softmax(x):
+    """Applies the softmax function to the last axis of x."""
+    exp = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return exp / np.sum(exp, axis=-1, keepdims=True)
+
+
+ACTIVATIONS['softmax'] = softmax
+
+# the derivatives of activation functions, as functions of the gradients,
+# inputs & outputs of the activation
+ACTIVATION_GRADIENTS = {
+    'linear': lambda gradients, x, y: gradients,
+    'relu': lambda gradients, x, y: gradients * (x > 0),
+    'sigmoid': lambda gradients, x, y: gradients * y * (1 - y),
+    'tanh': lambda gradients, x, y: gradients * (1 - y ** 2),
+    'softmax': lambda gradients, x, y: y * (
+        gradients - np.sum(gradients * y, axis=-1, keepdims=True)),
+}
+
+
+def dense(x, kernel, bias):
+    """Applies a fully connected layer to a batch of vectors."""
+    return x @ kernel + bias
+
+
+def conv2d(x, kernel, bias):
+    """
+    Applies a 2D convolution with 'valid' padding and unit strides to a batch
+    of channels-last images by multiplying the im2col matrix of the batch with
+    the flattened kernel.
+    """
+    kernel_height, kernel_width, in_channels, out_channels = kernel.shape
+
+    windows = np.lib.stride_tricks.sliding_window_view(
+        x, (kernel_height, kernel_width), axis=(1, 2))
+    num_images, out_height, out_width = windows.shape[:3]
+
+    columns = windows.transpose(0, 1, 2, 4, 5, 3).reshape(
+        -1, kernel_height * kernel_width * in_channels)
+    output = columns @ kernel.reshape(-1, out_channels) + bias
+
+    return output.reshape(num_images, out_height, out_width, out_channels)
+
+
+def conv2d_gradients(gradients, x, kernel):
+    """Returns the gradients of a conv2d layer's inputs x given the
+    gradients of its outputs, by scattering the gradients of the im2col
+    matrix back to the windows."""
+    kernel_height, kernel_width, in_channels, out_channels = kernel.shape
+    num_images, out_height, out_width = gradients.shape[:3]
+
+    columns = gradients.reshape(-1, out_channels) \
+        @ kernel.reshape(-1, out_channels).T
+    columns = columns.reshape(num_images, out_height, out_width,
+                              kernel_height, kernel_width, in_channels)
+
+    x_gradients = np.zeros_like(x)
+
+    for i in range(kernel_height):
+        for j in range(kernel_width):
+            x_gradients[:, i:i + out_height, j:j + out_width] += \
+                columns[:, :, :, i, j]
+
+    return x_gradients
+
+
+def max_pooling2d(x, pool_size=2):
+    """Applies 2D max pooling with 'valid' padding to a batch of
+    channels-last images."""
+    num_images, height, width, channels = x.shape
+    height, width = height // pool_size, width // pool_size
+
+    x = x[:, :height * pool_size, :width * pool_size]
+    x = x.reshape(num_images, height, pool_size, width, pool_size, channels)
+
+    return x.max(axis=(2, 4))
+
+
+def max_pooling2d_gradients(gradients, x, y, pool_size=2):
+    """Returns the gradients of a max_pooling2d layer's inputs x given its
+    outputs y and their gradients, which are passed to the maxima of the
+    pools."""
+    num_images, height, width, channels = y.shape
+
+    pools = x[:, :height * pool_size, :width * pool_size].reshape(
+        num_images, height, pool_size, width, pool_size, channels)
+    maxima = pools == y[:, :, None, :, None]
+
+    x_gradients = np.zeros_like(x)
+    x_gradients[:, :height * pool_size, :width * pool_size] = (
+        maxima * gradients[:, :, None, :, None]).reshape(
+        num_images, height * pool_size, width * pool_size, channels)
+
+    return x_gradients
+
+
+class NumpyNetwork:
+    """A NumPy implementation of the inference pass of a Keras Sequential
+    model, which can also backpropagate to the inputs.
+
+    The layers are read from a Keras HDF5 weights file. Since the file does
+    not describe activation functions, they are taken from the activations
+    tuple, in the order in which activation layers appear. Convolution and
+    pooling layers are assumed to use Keras defaults - 'valid' padding, unit
+    convolution strides and a pool size of 2.
+
+    Attributes:
+        activations: a tuple of activation functions for each activation layer
+        layers: a list of (layer type, weights) pairs
+    """
+
+    def __init__(self, activations):
+        """Initializes NumpyNetwork attributes."""
+        self.activations = activations
+        self.layers = []
+
+    def load_weights(self, weights_path):
+        """Loads the layers & weights from the specified HDF5 file."""
+        import h5py
+
+        self.layers = []
+        activations = iter(self.activations)
+
+        with h5py.File(weights_path, 'r') as weights_file:
+            if 'model_weights' in weights_file:
+                weights_file = weights_file['model_weights']
+
+            for name in weights_file.attrs['layer_names']:
+                name = name.decode() if isinstance(name, bytes) else name
+                layer_type = re.sub(r'_\d+$', '', name)
+                group = weights_file[name]
+
+                weights = [np.array(group[weight_name])
+                           for weight_name in group.attrs['weight_names']]
+
+                if layer_type == 'activation':
+                    weights = [next(activations)]
+
+                self.layers.append((layer_type, weights))
+
+    def summary(self):
+        """Prints a summary of the loaded layers."""
+        for layer_type, weights in self.layers:
+            details = ' '.join(str(w.shape) if isinstance(w, np.ndarray)
+                               else w for w in weights)
+            print(f'{layer_type} {details}'.rstrip())
+
+    def predict(self, x, batch_size=None):
+        """
+        Returns the predictions obtained for the given batch of inputs.
+
+        :param x: the inputs stacked along the first axis
+        :param batch_size: the max number of inputs per forward pass (all
+                           inputs are passed at once if None)
+        :return: the predictions, one row per input
+        """
+        x = np.asarray(x, dtype='float32')
+
+        if batch_size is None or batch_size >= len(x):
+            return self._forward(x)
+
+        return np.concatenate([self._forward(x[i:i + batch_size])
+                               for i in range(0, len(x), batch_size)])
+
+    def gradient(self, x, output_weights, batch_size=None):
+        """
+        Returns the gradients of a weighted sum of the outputs with respect
+        to the given batch of inputs.
+
+        :param x: the inputs stacked along the first axis
+        :param output_weights: the weights of the outputs in the sum
+        :param batch_size: the max number of inputs per pass (all inputs are
+                           passed at once if None)
+        :return: the gradients, one per input
+        """
+        x = np.asarray(x, dtype='float32')
+        output_weights = np.asarray(output_weights, dtype='float32')
+
+        if batch_size is None or batch_size >= len(x):
+            return self._backward(x, output_weights)
+
+        return np.concatenate([self._backward(x[i:i + batch_size],
+                                              output_weights)
+                               for i in range(0, len(x), batch_size)])
+
+    def _forward(self, x, inputs=None):
+        """
+        Returns the outputs of a forward pass of the given batch.
+
+        :param inputs: a list the inputs of every layer are appended to, or
+                       None
+        """
+        for layer_type, weights in self.layers:
+            if inputs is not None:
+                inputs.append(x)
+
+            if layer_type == 'dense':
+                x = dense(x, *weights)
+            elif layer_type == 'conv2d':
+                x = conv2d(x, *weights)
+            elif layer_type == 'max_pooling2d':
+                x = max_pooling2d(x)
+            elif layer_type == 'flatten':
+                x = x.reshape(len(x), -1)
+            elif layer_type == 'activation':
+                x = ACTIVATIONS[weights[0]](x)
+            elif layer_type != 'dropout':
+                raise ValueError(f'unsupported layer type: {layer_type}')
+
+        return x
+
+    def _backward(self, x, output_weights):
+        """Returns the gradients of the weighted sum of the outputs with
+        respect to the given batch, by backpropagation."""
+        inputs = []
+        y = self._forward(x, inputs)
+        gradients = np.broadcast_to(output_weights, y.shape)
+
+        for (layer_type, weights), x in zip(reversed(self.layers),
+                                            reversed(inputs)):
+            if layer_type == 'dense':
+                gradients = gradients @ weights[0].T
+            elif layer_type == 'conv2d':
+                gradients = conv2d_gradients(gradients, x, weights[0])
+            elif layer_type == 'max_pooling2d':
+                gradients = max_pooling2d_gradients(gradients, x, y)
+            elif layer_type == 'flatten':
+                gradients = gradients.reshape(x.shape)
+            elif layer_type == 'activation':
+                gradients = ACTIVATION_GRADIENTS[weights[0]](gradients, x, y)
+
+            y = x
+
+        return gradients
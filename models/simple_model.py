@@ -1,6 +1,3 @@
-from keras.layers import Dense, Activation
-from keras.models import Sequential
-
 import util
 from models.attack_model import AttackModel
 
@@ -13,17 +10,22 @@ class SimpleModel(AttackModel):
     INPUT_SHAPE = (28 * 28, )
     NUM_OUTPUTS = 10
 
-    def __init__(self, layer_sizes=(128, 10), activations=('relu', 'softmax')):
+    def __init__(self, layer_sizes=(128, 10), activations=('relu', 'softmax'),
+                 backend='keras'):
         """
         Inits SimpleModel attributes.
 
         :param layer_sizes: a tuple of hidden and output layer sizes
         :param activations: a tuple of activation functions for each layer
+        :param backend: the backend to use - 'keras' or 'numpy'
         """
-        super().__init__(layer_sizes, activations)
+        super().__init__(layer_sizes, activations, backend)
 
     def _build(self):
         """Builds this model."""
+        from keras.layers import Dense, Activation
+        from keras.models import Sequential
+
         model = Sequential()
 
         model.add(Dense(self.layer_sizes[0], input_shape=self.INPUT_SHAPE))
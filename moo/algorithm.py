@@ -0,0 +1,366 @@
+import sys
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+import numpy as np
+
+from moo.archive import FrontArchive, nondominated
+from moo.indicators import hypervolume
+from moo.population.population import Population
+
+
+class PhaseTimer:
+    """Accumulates the wall time spent in named phases of a generation.
+
+    Attributes:
+        times: a dict mapping phase names to the time spent in them
+    """
+
+    def __init__(self):
+        """Initializes PhaseTimer attributes."""
+        self.times = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block as part of the named phase."""
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.times[name] = (self.times.get(name, 0.0)
+                                + time.perf_counter() - start)
+
+
+def peak_memory():
+    """Returns the peak resident set size of the process in bytes, or None
+    if the platform does not report it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # macOS reports bytes, other platforms kilobytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Algorithm(ABC):
+    """The base class for MOO algorithms.
+
+    Attributes:
+        problem: the multi-objective optimization problem to solve
+        pop_size: the size of the population
+        max_iterations: the maximum number of algorithm iterations
+        observers: a list of Observers notified about runs & generations
+        rng: the np.random.Generator used for all random decisions
+        stopping_criteria: a list of StoppingCriteria that can end a run early
+        evaluations: the number of solutions evaluated in the current run
+        model_calls: the number of model forward passes in the current run
+        start_time: the time.perf_counter() value at the start of the run
+        iterations: the number of generations completed in the current run
+        stop_reason: the reason why the last run stopped
+        checkpoint: a Checkpoint the state of runs is saved to or None
+        archive_front: if True, runs return every non-dominated solution
+                       evaluated during the run instead of the non-dominated
+                       solutions of the final population
+        front_archive: the FrontArchive of the current run or None
+        refinement: a GradientRefinement applied to offspring or None
+        migration: the Migration exchanging solutions with other islands of
+                   an IslandModel or None
+        tile_size: the number of rows of the domination & distance matrices
+                   computed at once, or None to compute whole matrices
+    """
+
+    def __init__(self, problem, pop_size, max_iterations, observers=(),
+                 rng=None, stopping_criteria=(), archive_front=False,
+                 refinement=None, tile_size=None):
+        """Initializes Algorithm attributes.
+
+        :param rng: a np.random.Generator or a seed used to create one
+        """
+        self.problem = problem
+        self.pop_size = pop_size
+        self.max_iterations = max_iterations
+        self.observers = list(observers)
+        self.rng = np.random.default_rng(rng)
+        self.stopping_criteria = list(stopping_criteria)
+        self.archive_front = archive_front
+        self.refinement = refinement
+        self.tile_size = tile_size
+
+        self.evaluations = 0
+        self.model_calls = 0
+        self.start_time = None
+        self.iterations = 0
+        self.stop_reason = None
+        self.checkpoint = None
+        self.front_archive = None
+        self.migration = None
+
+        self._immigrants = None
+
+        self._reported_evaluations = 0
+        self._reported_model_calls = 0
+
+    def run(self, orig_image, label):
+        """Executes the algorithm."""
+        steps = self.iterate(orig_image, label)
+
+        try:
+            population = next(steps)
+
+            while True:
+                self.problem.evaluate(population, orig_image, label)
+                population = next(steps)
+        except StopIteration as stop:
+            return stop.value
+
+    @abstractmethod
+    def iterate(self, orig_image, label):
+        """
+        Executes the algorithm step by step.
+
+        A generator that yields every population that has to be evaluated
+        before the algorithm can continue, so the caller can evaluate the
+        populations of several runs together.
+
+        :return: the final non-dominated set
+        """
+
+    def hypervolume(self, front):
+        """Returns the hypervolume of the given front with respect to the
+        problem's reference point, or to o_maxs if it has none."""
+        reference_point = self.problem.reference_point
+
+        if reference_point is None:
+            reference_point = self.problem.o_maxs
+
+        return hypervolume(front.objectives, reference_point)
+
+    def _evaluate(self, population):
+        """Yields the given population to be evaluated by the caller of
+        iterate and counts the evaluations."""
+        model_calls = self.problem.model_calls
+
+        yield population
+
+        self._count_evaluations(population)
+        self.model_calls += self.problem.model_calls - model_calls
+
+    def _count_evaluations(self, population):
+        """Counts the evaluations of the given evaluated population and adds
+        it to the front archive, if any."""
+        if self.front_archive is not None:
+            self.front_archive.update(population)
+
+        self.evaluations += len(population)
+
+    def _tiles(self, rows, length):
+        """
+        Yields the given rows whole, or in tiles of at most tile_size rows if
+        tiles are enabled.
+
+        :param rows: an array of row indices or None for all rows
+        :param length: the number of rows
+        :return: a generator of index arrays or slices
+        """
+        if self.tile_size is None:
+            yield slice(None) if rows is None else rows
+            return
+
+        for start in range(0, length if rows is None else len(rows),
+                           self.tile_size):
+            end = start + self.tile_size
+            yield slice(start, end) if rows is None else rows[start:end]
+
+    def _domination(self, population):
+        """
+        Returns the domination matrix of the given population and the number
+        of solutions dominating each solution.
+
+        If tiles are enabled, the matrix is computed tile by tile and stored
+        bit-packed along its rows, which takes 1/8 of the memory of a boolean
+        matrix. Its rows are read by _domination_rows.
+        """
+        if self.tile_size is None:
+            dominates = population.domination_matrix()
+            return dominates, dominates.sum(axis=0)
+
+        dominates = np.empty((len(population), (len(population) + 7) // 8),
+                             dtype='uint8')
+        dominated_by = np.zeros(len(population), dtype='int64')
+
+        for rows in self._tiles(None, len(population)):
+            tile = population.domination_matrix(rows)
+            dominated_by += tile.sum(axis=0)
+            dominates[rows] = np.packbits(tile, axis=1)
+
+        return dominates, dominated_by
+
+    def _domination_rows(self, dominates, rows, length):
+        """
+        Yields the given rows of a domination matrix returned by _domination
+        as boolean matrices, in tiles if tiles are enabled.
+
+        :param dominates: the domination matrix
+        :param rows: an array of row indices or None for all rows
+        :param length: the number of solutions
+        :return: a generator of tuples of the row indices and their rows
+        """
+        for tile_rows in self._tiles(rows, length):
+            if self.tile_size is None:
+                yield tile_rows, dominates[tile_rows]
+            else:
+                yield tile_rows, np.unpackbits(dominates[tile_rows], axis=1,
+                                               count=length).view(bool)
+
+    def _refine(self, offspring, orig_image, label, timer):
+        """Applies the refinement operator, if any, to the given offspring
+        and counts its model calls."""
+        if self.refinement is None:
+            return
+
+        model_calls = self.problem.model_calls
+
+        with timer.phase('refinement'):
+            self.refinement.refine(offspring, orig_image, label, self.rng)
+
+        self.model_calls += self.problem.model_calls - model_calls
+
+    def _notify(self, event, *args):
+        """Calls the given event handler of every observer."""
+        for observer in self.observers:
+            getattr(observer, event)(self, *args)
+
+    def _start(self, orig_image, label):
+        """Resets the run counters and notifies observers & criteria."""
+        self.evaluations = 0
+        self.model_calls = 0
+        self.start_time = time.perf_counter()
+        self.iterations = 0
+        self.stop_reason = 'max_iterations'
+        self.front_archive = (FrontArchive(self.problem) if self.archive_front
+                              else None)
+
+        self._reported_evaluations = 0
+        self._reported_model_calls = 0
+
+        for criterion in self.stopping_criteria:
+            criterion.start(self)
+
+        self._notify('on_run_start', orig_image, label)
+
+    def _end_generation(self, iteration, timer, front, label, **stats):
+        """
+        Reports a finished generation to observers, checks the stopping
+        criteria and migrates solutions if the algorithm runs on an island.
+
+        :param iteration: the index of the generation
+        :param timer: the PhaseTimer of the generation
+        :param front: the current non-dominated set
+        :param label: the label of the current run
+        :param stats: additional algorithm-specific statistics
+        :return: True if the run should stop
+        """
+        self.iterations = iteration + 1
+
+        if self.observers:
+            self._report_generation(iteration, timer, front, stats)
+
+        for criterion in self.stopping_criteria:
+            if criterion.should_stop(self, front, label):
+                self.stop_reason = criterion.REASON
+                return True
+
+        if self.migration is not None:
+            self._immigrants, stop_reason = self.migration.exchange(
+                self, iteration, front)
+
+            if stop_reason is not None:
+                self.stop_reason = stop_reason
+                return True
+
+        return False
+
+    def _take_immigrants(self):
+        """Returns the solutions received from other islands after the last
+        generation, or None."""
+        immigrants, self._immigrants = self._immigrants, None
+
+        if immigrants is not None:
+            self.problem._update_o_extremes(immigrants)
+
+        return immigrants
+
+    def _resume(self, **population_classes):
+        """
+        Restores the state of an interrupted run from the checkpoint.
+
+        :param population_classes: the Population classes of the populations
+                                   saved in the checkpoint, by name
+        :return: the index of the iteration to resume the run from and a
+                 dict of the restored populations, or None if there is no
+                 run to resume
+        """
+        if self.checkpoint is None:
+            return None
+
+        if self.front_archive is not None:
+            population_classes['front_archive'] = Population
+
+        state = self.checkpoint.restore(self, population_classes)
+
+        if state is not None:
+            self.iterations = state[0]
+
+            if self.front_archive is not None:
+                self.front_archive.update(state[1].pop('front_archive'))
+            self._reported_evaluations = self.evaluations
+            self._reported_model_calls = self.model_calls
+
+        return state
+
+    def _save_checkpoint(self, iteration, **populations):
+        """Saves the state of the run after the given iteration, if a
+        checkpoint is due."""
+        if (self.checkpoint is not None
+                and (iteration + 1) % self.checkpoint.interval == 0):
+            if self.front_archive is not None:
+                populations['front_archive'] = self.front_archive.population()
+
+            self.checkpoint.save(self, iteration + 1, populations)
+
+    def _result(self, population):
+        """Returns the non-dominated solutions of the given final population,
+        or of the whole run if the front is archived."""
+        if self.front_archive is not None:
+            return self.front_archive.population()
+
+        return nondominated(population)
+
+    def _report_generation(self, iteration, timer, front, stats):
+        """Notifies observers about a finished generation."""
+        stats = {
+            'iteration': iteration,
+            'times': timer.times,
+            'evaluations': self.evaluations - self._reported_evaluations,
+            'model_calls': self.model_calls - self._reported_model_calls,
+            'front_size': len(front),
+            'hypervolume': self.hypervolume(front),
+            'peak_memory': peak_memory(),
+            **stats,
+        }
+
+        self._reported_evaluations = self.evaluations
+        self._reported_model_calls = self.model_calls
+
+        self._notify('on_generation', stats)
+
+    def _finish(self, result):
+        """Notifies observers about the result and returns it."""
+        self._notify('on_run_end', result)
+
+        return result
@@ -0,0 +1,341 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from moo.population.population import Population
+
+
+class NondominatedArchive(ABC):
+    """An archive of mutually non-dominated points supporting incremental
+    insertion.
+
+    Every point is stored with an arbitrary item (e.g. the index or the data
+    of the solution it describes). A point is only inserted if no archived
+    point weakly dominates it, and inserting it removes every archived point
+    it dominates, so duplicates are never archived.
+    """
+
+    @abstractmethod
+    def __len__(self):
+        """Returns the number of archived points."""
+
+    @abstractmethod
+    def insert(self, point, item):
+        """
+        Inserts the given point into the archive if it is not weakly
+        dominated by an archived point.
+
+        :param point: the objectives of the point
+        :param item: the item stored with the point
+        :return: True if the point was inserted
+        """
+
+    @abstractmethod
+    def items(self):
+        """Returns a list of the items of all archived points."""
+
+
+class BiObjectiveArchive(NondominatedArchive):
+    """A non-dominated archive of points with two objectives.
+
+    Points are kept in a list sorted by the first objective, which makes the
+    second objective strictly decreasing, so both the dominance check and
+    the removal of dominated points are binary searches.
+    """
+
+    def __init__(self):
+        """Initializes BiObjectiveArchive attributes."""
+        self._firsts = []
+        self._negated_seconds = []
+        self._items = []
+
+    def __len__(self):
+        """Returns the number of archived points."""
+        return len(self._items)
+
+    def insert(self, point, item):
+        """Inserts the given point if it is not weakly dominated."""
+        first, second = float(point[0]), float(point[1])
+
+        # the last point not worse in the first objective has the best
+        # second objective among all such points
+        predecessor = bisect_right(self._firsts, first)
+
+        if predecessor and -self._negated_seconds[predecessor - 1] <= second:
+            return False
+
+        # the dominated points are the ones not better in the first
+        # objective whose second objective is not better either
+        start = bisect_left(self._firsts, first)
+        end = bisect_right(self._negated_seconds, -second, lo=start)
+
+        self._firsts[start:end] = [first]
+        self._negated_seconds[start:end] = [-second]
+        self._items[start:end] = [item]
+
+        return True
+
+    def items(self):
+        """Returns the items sorted by the first objective."""
+        return list(self._items)
+
+
+class _Node:
+    """A node of an ND-tree.
+
+    The bounds are plain lists, since comparing a few floats in Python is
+    much faster than calling NumPy on tiny arrays.
+
+    Attributes:
+        ideal: the lowest values of each objective in the subtree
+        nadir: the highest values of each objective in the subtree
+        points: the points matrix of a leaf or None for internal nodes
+        items: the items of a leaf's points
+        children: the child nodes of an internal node
+    """
+
+    def __init__(self, points, items):
+        """Initializes _Node attributes."""
+        self.points = points
+        self.items = items
+        self.children = []
+
+        self.ideal = points.min(axis=0).tolist()
+        self.nadir = points.max(axis=0).tolist()
+
+
+def _weakly_dominates(first, second):
+    """Returns True if the first point is not worse than the second one in
+    any objective."""
+    return all(a <= b for a, b in zip(first, second))
+
+
+class NDTreeArchive(NondominatedArchive):
+    """A non-dominated archive of points with any number of objectives.
+
+    Points are stored in the leaves of an ND-tree, whose every node bounds
+    its points by their ideal & nadir points. Whole subtrees are accepted or
+    skipped by comparing a point with their bounds, so dominance checks and
+    removals rarely visit more than a few leaves.
+
+    Jaszkiewicz, Andrzej, and Thibaut Lust. "ND-tree-based update: a fast
+    algorithm for the dynamic nondominance problem." IEEE Transactions on
+    Evolutionary Computation 22.5 (2018): 778-791.
+
+    Attributes:
+        max_leaf_size: the max number of points in a leaf
+        num_children: the number of children a full leaf is split into
+    """
+
+    def __init__(self, max_leaf_size=100, num_children=None):
+        """Initializes NDTreeArchive attributes.
+
+        :param num_children: the number of children of split leaves (the
+                             number of objectives + 1 by default)
+        """
+        self.max_leaf_size = max_leaf_size
+        self.num_children = num_children
+
+        self._root = None
+        self._size = 0
+
+    def __len__(self):
+        """Returns the number of archived points."""
+        return self._size
+
+    def insert(self, point, item):
+        """Inserts the given point if it is not weakly dominated."""
+        point = np.asarray(point, dtype=float)
+        values = point.tolist()
+
+        if self._root is None:
+            self._root = _Node(point[None, :], [item])
+            self._size = 1
+            return True
+
+        if self._is_dominated(self._root, point, values):
+            return False
+
+        if self._remove_dominated(self._root, point, values):
+            self._root = None
+
+        if self._root is None:
+            self._root = _Node(point[None, :], [item])
+        else:
+            self._insert(self._root, point, values, item)
+
+        self._size += 1
+
+        return True
+
+    def items(self):
+        """Returns the items of all archived points."""
+        items = []
+        nodes = [self._root] if self._root is not None else []
+
+        while nodes:
+            node = nodes.pop()
+
+            if node.points is not None:
+                items.extend(node.items)
+            else:
+                nodes.extend(reversed(node.children))
+
+        return items
+
+    def _is_dominated(self, node, point, values):
+        """Returns True if a point in the subtree weakly dominates the given
+        point, whose values are also given as a list."""
+        if _weakly_dominates(node.nadir, values):
+            return True
+
+        if not _weakly_dominates(node.ideal, values):
+            return False
+
+        if node.points is not None:
+            return bool(np.any(np.all(node.points <= point, axis=1)))
+
+        return any(self._is_dominated(child, point, values)
+                   for child in node.children)
+
+    def _remove_dominated(self, node, point, values):
+        """
+        Removes the points in the subtree dominated by the given point, which
+        no point in the subtree weakly dominates.
+
+        :return: True if the whole subtree was removed
+        """
+        if _weakly_dominates(values, node.ideal):
+            self._size -= self._count(node)
+            return True
+
+        if not _weakly_dominates(values, node.nadir):
+            return False
+
+        if node.points is not None:
+            kept = ~np.all(point <= node.points, axis=1)
+
+            if not kept.all():
+                self._size -= int(np.count_nonzero(~kept))
+                node.points = node.points[kept]
+                node.items = [item for item, keep in zip(node.items, kept)
+                              if keep]
+
+            return not len(node.points)
+
+        node.children = [child for child in node.children
+                         if not self._remove_dominated(child, point, values)]
+
+        return not node.children
+
+    def _insert(self, node, point, values, item):
+        """Inserts the given point into the closest leaf of the subtree."""
+        while True:
+            node.ideal = [min(a, b) for a, b in zip(node.ideal, values)]
+            node.nadir = [max(a, b) for a, b in zip(node.nadir, values)]
+
+            if node.points is not None:
+                break
+
+            node = min(node.children, key=lambda child: sum(
+                (value - (low + high) / 2) ** 2 for value, low, high
+                in zip(values, child.ideal, child.nadir)))
+
+        node.points = np.vstack((node.points, point))
+        node.items.append(item)
+
+        if len(node.points) > self.max_leaf_size:
+            self._split(node)
+
+    def _split(self, leaf):
+        """Splits the given leaf into children grouping close points."""
+        points = leaf.points
+        num_children = min(self.num_children or points.shape[1] + 1,
+                           len(points))
+
+        # seeds are chosen greedily to be far from each other
+        seeds = [int(np.argmax(np.sum((points - points.mean(axis=0)) ** 2,
+                                      axis=1)))]
+        distances = np.sum((points - points[seeds[0]]) ** 2, axis=1)
+
+        while len(seeds) < num_children:
+            seeds.append(int(np.argmax(distances)))
+            distances = np.minimum(distances, np.sum(
+                (points - points[seeds[-1]]) ** 2, axis=1))
+
+        assignments = np.argmin(np.stack([
+            np.sum((points - points[seed]) ** 2, axis=1) for seed in seeds]),
+            axis=0)
+
+        leaf.children = [
+            _Node(points[assignments == child],
+                  [item for item, assignment in zip(leaf.items, assignments)
+                   if assignment == child])
+            for child in range(num_children)]
+        leaf.points = None
+        leaf.items = None
+
+    def _count(self, node):
+        """Returns the number of points in the subtree."""
+        if node.points is not None:
+            return len(node.points)
+
+        return sum(self._count(child) for child in node.children)
+
+
+def create_archive(num_objectives):
+    """Returns an empty non-dominated archive suited to the given number of
+    objectives."""
+    if num_objectives == 2:
+        return BiObjectiveArchive()
+
+    return NDTreeArchive()
+
+
+def nondominated(population):
+    """Returns the non-dominated solutions of the given population, keeping
+    only the first of solutions with equal objectives."""
+    archive = create_archive(population.problem.num_objectives)
+
+    for i, objectives in enumerate(population.objectives):
+        archive.insert(objectives, i)
+
+    return population[np.sort(np.array(archive.items(), dtype=int))]
+
+
+class FrontArchive:
+    """Keeps every non-dominated solution evaluated during a run.
+
+    Attributes:
+        problem: the problem whose solutions are archived
+    """
+
+    def __init__(self, problem):
+        """Initializes FrontArchive attributes."""
+        self.problem = problem
+
+        self._archive = create_archive(problem.num_objectives)
+
+    def __len__(self):
+        """Returns the number of archived solutions."""
+        return len(self._archive)
+
+    def update(self, population):
+        """Archives the solutions of the given evaluated population that are
+        not weakly dominated by archived ones."""
+        for i in range(len(population)):
+            self._archive.insert(population.objectives[i], tuple(
+                getattr(population, column)[i].copy()
+                for column in Population.COLUMNS))
+
+    def population(self):
+        """Returns a Population of the archived solutions."""
+        rows = self._archive.items()
+
+        if not rows:
+            return Population(self.problem)
+
+        return Population.from_columns(self.problem, {
+            column: np.stack([row[i] for row in rows])
+            for i, column in enumerate(Population.COLUMNS)})
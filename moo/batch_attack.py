@@ -0,0 +1,65 @@
+from moo.problem.attack_problem import evaluate_batch
+
+
+class BatchAttack:
+    """Runs independent attacks of several images in lockstep.
+
+    Every attack has its own algorithm and problem, but all problems attack
+    the same model. In every generation, the populations the attacks need to
+    evaluate are passed to the model together, so K attacks of population
+    size N cost one forward pass of K * N images instead of K passes of N.
+    Attacks that stop early simply drop out of the following batches.
+
+    Attributes:
+        algorithms: the Algorithms running the attacks, one per image
+    """
+
+    def __init__(self, algorithms):
+        """Initializes BatchAttack attributes."""
+        self.algorithms = list(algorithms)
+
+    def run(self, orig_images, labels):
+        """
+        Attacks the given images in lockstep.
+
+        :param orig_images: the attacked images, one per algorithm
+        :param labels: the attacked labels, one per algorithm
+        :return: a list of the final non-dominated sets, one per algorithm
+        """
+        results = [None] * len(self.algorithms)
+        running = {}
+
+        for i, (algorithm, orig_image, label) in enumerate(
+                zip(self.algorithms, orig_images, labels)):
+            running[i] = algorithm.iterate(orig_image, label)
+
+        populations = self._advance(running, results, dict.fromkeys(running))
+
+        while running:
+            evaluate_batch([self.algorithms[i].problem for i in running],
+                           list(populations.values()),
+                           [orig_images[i] for i in running],
+                           [labels[i] for i in running])
+
+            populations = self._advance(running, results, populations)
+
+        return results
+
+    @staticmethod
+    def _advance(running, results, populations):
+        """
+        Resumes every running attack until it needs another evaluation,
+        removing finished attacks and storing their results.
+
+        :return: a dict mapping attack indices to populations to evaluate
+        """
+        next_populations = {}
+
+        for i in populations:
+            try:
+                next_populations[i] = next(running[i])
+            except StopIteration as stop:
+                results[i] = stop.value
+                del running[i]
+
+        return next_populations
@@ -0,0 +1,104 @@
+import json
+import os
+import time
+
+import numpy as np
+
+
+def save_npz(path, compressed=False, **arrays):
+    """Saves the given arrays to an .npz file atomically, so an interrupted
+    write never leaves a corrupted file behind."""
+    tmp_path = path + '.tmp'
+    save = np.savez_compressed if compressed else np.savez
+
+    with open(tmp_path, 'wb') as file:
+        save(file, **arrays)
+
+    os.replace(tmp_path, path)
+
+
+class Checkpoint:
+    """Periodically saves the state of an algorithm run to an .npz file, so an
+    interrupted run can be resumed from its last checkpoint.
+
+    The state consists of the columns of the algorithm's populations, the
+    state of its rng, the problem's objective extremes, the run counters and
+    the state of the stopping criteria.
+
+    Attributes:
+        path: the path of the .npz file
+        interval: the number of generations between checkpoints
+    """
+
+    def __init__(self, path, interval=1):
+        """Initializes Checkpoint attributes."""
+        self.path = path
+        self.interval = interval
+
+    def save(self, algorithm, iteration, populations):
+        """
+        Saves the state of the given algorithm's run.
+
+        :param algorithm: the running algorithm
+        :param iteration: the index of the iteration to resume the run from
+        :param populations: a dict of the populations needed to resume the
+                            run, by name
+        """
+        arrays = {
+            'iteration': iteration,
+            'evaluations': algorithm.evaluations,
+            'model_calls': algorithm.model_calls,
+            'elapsed': time.perf_counter() - algorithm.start_time,
+            'rng': json.dumps(algorithm.rng.bit_generator.state),
+            'criteria': json.dumps([criterion.get_state() for criterion
+                                    in algorithm.stopping_criteria]),
+            'o_mins': algorithm.problem.o_mins,
+            'o_maxs': algorithm.problem.o_maxs,
+        }
+
+        for name, population in populations.items():
+            for column in population.COLUMNS:
+                arrays[f'{name}.{column}'] = getattr(population, column)
+
+        save_npz(self.path, **arrays)
+
+    def restore(self, algorithm, population_classes):
+        """
+        Restores the state of a run of the given algorithm.
+
+        :param algorithm: the algorithm whose run is resumed
+        :param population_classes: a dict of the Population classes of the
+                                   saved populations, by name
+        :return: the index of the iteration to resume the run from and a
+                 dict of the restored populations, or None if there is no
+                 checkpoint to restore
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with np.load(self.path) as data:
+            algorithm.evaluations = int(data['evaluations'])
+            algorithm.model_calls = int(data['model_calls'])
+            algorithm.start_time = time.perf_counter() - float(data['elapsed'])
+            algorithm.rng.bit_generator.state = json.loads(str(data['rng']))
+
+            for criterion, state in zip(algorithm.stopping_criteria,
+                                        json.loads(str(data['criteria']))):
+                criterion.set_state(state)
+
+            algorithm.problem.o_mins = data['o_mins']
+            algorithm.problem.o_maxs = data['o_maxs']
+
+            populations = {
+                name: population_class.from_columns(
+                    algorithm.problem,
+                    {column: data[f'{name}.{column}']
+                     for column in population_class.COLUMNS})
+                for name, population_class in population_classes.items()}
+
+            return int(data['iteration']), populations
+
+    def remove(self):
+        """Removes the checkpoint file, if there is one."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
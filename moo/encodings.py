@@ -0,0 +1,342 @@
+import math
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from moo import operators
+
+
+class Encoding(ABC):
+    """The base class for encodings of solutions' decision variables.
+
+    An encoding decodes the decision variables of a batch of solutions to
+    the perturbations they describe, and provides crossover & mutation
+    operators matching its representation. By default, variables are crossed
+    by uniform crossover and mutated by small uniform perturbations.
+
+    Attributes:
+        num_variables: the shape of a solution's decision variables
+        mins: the lowest initial values of the decision variables
+        maxs: the highest initial values of the decision variables
+        mutation_probability: the probability of mutating a variable
+        mutation_scale: the max absolute change of a mutated variable
+    """
+
+    def __init__(self, num_variables, mins, maxs, mutation_probability=0.02,
+                 mutation_scale=0.02):
+        """Initializes Encoding attributes."""
+        self.num_variables = num_variables
+        self.mins = mins
+        self.maxs = maxs
+        self.mutation_probability = mutation_probability
+        self.mutation_scale = mutation_scale
+
+    @abstractmethod
+    def decode(self, variables):
+        """Returns the perturbations described by the given decision
+        variables matrix, one per row."""
+
+    def variable_gradients(self, variables, gradients):
+        """
+        Returns the gradients of a function of the decoded perturbations with
+        respect to the decision variables.
+
+        :param variables: the decision variables matrix, one row per solution
+        :param gradients: the gradients of the function with respect to the
+                          perturbations the variables decode to
+        """
+        raise NotImplementedError(
+            f'{type(self).__name__} does not support gradients')
+
+    def cross(self, parents_1, parents_2, rng):
+        """Crosses the given parent decision variables matrices."""
+        return operators.cross(parents_1, parents_2, rng)
+
+    def mutate(self, variables, rng):
+        """Mutates the given decision variables matrix in place."""
+        operators.mutate(variables, rng, self.mutation_probability,
+                         self.mutation_scale)
+
+
+class DenseEncoding(Encoding):
+    """Encodes every element of a perturbation as a decision variable.
+
+    The decision variables are the perturbations themselves, so changes made
+    to the decoded perturbations (e.g. clipping) repair the variables.
+    """
+
+    def decode(self, variables):
+        """Returns the given decision variables matrix."""
+        return variables
+
+    def variable_gradients(self, variables, gradients):
+        """Returns the given perturbation gradients."""
+        return gradients
+
+
+class ImageEncoding(Encoding):
+    """The base class for compact encodings of image perturbations.
+
+    Decoded perturbations are clipped to the noise bounds, so mutations can
+    never exceed them. Flat inputs are encoded as square single-channel
+    images, e.g. 784 pixels as a 28x28x1 image, and their perturbations are
+    flattened back to the input shape.
+
+    Attributes:
+        input_shape: the shape of the perturbed images
+        image_shape: the (height, width, channels) shape of the images
+        noise_size: the max absolute value of a perturbation element
+    """
+
+    def __init__(self, input_shape, noise_size, num_variables, mins, maxs,
+                 mutation_probability, mutation_scale):
+        """Initializes ImageEncoding attributes."""
+        super().__init__(num_variables, mins, maxs, mutation_probability,
+                         mutation_scale)
+
+        self.input_shape = tuple(input_shape)
+        self.image_shape = image_shape(input_shape)
+        self.noise_size = noise_size
+
+    def decode(self, variables):
+        """Returns the perturbations described by the given decision
+        variables matrix, clipped to the noise bounds."""
+        perturbations = self._decode(variables)
+        np.clip(perturbations, -self.noise_size, self.noise_size,
+                out=perturbations)
+
+        return perturbations.reshape(len(variables), *self.input_shape)
+
+    @abstractmethod
+    def _decode(self, variables):
+        """Returns a new float32 array of the perturbations described by the
+        given decision variables matrix, in the image shape."""
+
+
+class SparseEncoding(ImageEncoding):
+    """Encodes a perturbation of k pixels as their positions & values.
+
+    Every solution is a (k, 1 + channels) matrix whose rows are genes
+    describing a single pixel - its flat position in the image followed by
+    its perturbation in each channel. Crossover swaps whole genes, and
+    mutation either moves a gene to a random pixel or changes its values.
+
+    Attributes:
+        num_pixels: the number of perturbed pixels (k)
+    """
+
+    def __init__(self, input_shape, noise_size, num_pixels=20,
+                 mutation_probability=None, mutation_scale=None):
+        """
+        Initializes SparseEncoding attributes.
+
+        :param mutation_probability: the probability of mutating a gene's
+                                     position or values (1/k by default)
+        :param mutation_scale: the max absolute change of a mutated value
+                               (half of the noise size by default)
+        """
+        height, width, channels = image_shape(input_shape)
+
+        super().__init__(
+            input_shape, noise_size, (num_pixels, 1 + channels),
+            np.array([0.0] + [-noise_size] * channels),
+            np.array([float(height * width)] + [noise_size] * channels),
+            mutation_probability or 1 / num_pixels,
+            mutation_scale or noise_size / 2)
+
+        self.num_pixels = num_pixels
+
+    def _decode(self, variables):
+        """Scatters the genes' values to their pixels."""
+        height, width, channels = self.image_shape
+        perturbations = np.zeros((len(variables), height * width, channels),
+                                 dtype='float32')
+
+        positions = np.clip(variables[..., 0].astype(int), 0,
+                            height * width - 1)
+        rows = np.arange(len(variables))[:, None]
+        perturbations[rows, positions] = variables[..., 1:]
+
+        return perturbations.reshape(len(variables), *self.image_shape)
+
+    def variable_gradients(self, variables, gradients):
+        """Gathers the gradients of the genes' pixels as the gradients of
+        their values. Positions are discrete, so their gradients are 0."""
+        height, width, channels = self.image_shape
+
+        positions = np.clip(variables[..., 0].astype(int), 0,
+                            height * width - 1)
+        rows = np.arange(len(variables))[:, None]
+
+        variable_gradients = np.zeros_like(variables)
+        variable_gradients[..., 1:] = gradients.reshape(
+            len(variables), height * width, channels)[rows, positions]
+
+        return variable_gradients
+
+    def cross(self, parents_1, parents_2, rng):
+        """Performs uniform crossover of whole genes."""
+        to_cross = rng.random((*parents_1.shape[:2], 1), dtype='float32') < 0.5
+
+        first_children = np.where(to_cross, parents_1, parents_2)
+        second_children = np.where(to_cross, parents_2, parents_1)
+
+        return first_children, second_children
+
+    def mutate(self, variables, rng):
+        """Moves genes to random pixels & perturbs their values in place."""
+        genes_shape = variables.shape[:2]
+
+        to_move = rng.random(genes_shape, dtype='float32') \
+            < self.mutation_probability
+        variables[..., 0][to_move] = rng.uniform(
+            0, self.maxs[0], np.count_nonzero(to_move))
+
+        values = variables[..., 1:]
+        to_perturb = rng.random(values.shape, dtype='float32') \
+            < self.mutation_probability
+        values[to_perturb] += rng.uniform(-self.mutation_scale,
+                                          self.mutation_scale,
+                                          np.count_nonzero(to_perturb))
+        np.clip(values, -self.noise_size, self.noise_size, out=values)
+
+
+class GridEncoding(ImageEncoding):
+    """Encodes a perturbation as a coarse grid upsampled to the image size.
+
+    Every grid cell covers a block of image pixels which all receive the
+    cell's perturbation (nearest-neighbour upsampling), e.g. a 7x7 grid
+    describes a 28x28 perturbation with 49 variables.
+
+    Attributes:
+        grid_size: the number of grid cells along each image axis
+    """
+
+    def __init__(self, input_shape, noise_size, grid_size=7,
+                 mutation_probability=None, mutation_scale=0.02):
+        """
+        Initializes GridEncoding attributes.
+
+        :param mutation_probability: the probability of mutating a cell
+                                     (one cell per solution by default)
+        """
+        height, width, channels = image_shape(input_shape)
+
+        if height % grid_size or width % grid_size:
+            raise ValueError(f'the grid size {grid_size} does not divide the '
+                             f'image size {height}x{width}')
+
+        super().__init__(input_shape, noise_size,
+                         (grid_size, grid_size, channels),
+                         -noise_size, noise_size,
+                         mutation_probability or 1 / grid_size ** 2,
+                         mutation_scale)
+
+        self.grid_size = grid_size
+
+    def _decode(self, variables):
+        """Upsamples the grids to the image size."""
+        height, width, _ = self.image_shape
+
+        perturbations = np.repeat(variables, height // self.grid_size, axis=1)
+
+        return np.repeat(perturbations, width // self.grid_size,
+                         axis=2).astype('float32')
+
+    def variable_gradients(self, variables, gradients):
+        """Sums the gradients of the pixels covered by every cell."""
+        height, width, channels = self.image_shape
+
+        return gradients.reshape(
+            len(variables), self.grid_size, height // self.grid_size,
+            self.grid_size, width // self.grid_size, channels).sum(axis=(2, 4))
+
+
+class DctEncoding(ImageEncoding):
+    """Encodes a perturbation as its lowest-frequency DCT coefficients.
+
+    Every solution holds the top-left size x size block of the orthonormal
+    2D DCT-II coefficients of a perturbation (per channel), and is decoded by
+    the inverse transform. The coefficient bounds are scaled so a random
+    solution has the same expected noise strength as a random dense
+    perturbation.
+
+    Attributes:
+        size: the number of coefficients along each image axis
+    """
+
+    def __init__(self, input_shape, noise_size, size=7,
+                 mutation_probability=None, mutation_scale=None):
+        """
+        Initializes DctEncoding attributes.
+
+        :param mutation_probability: the probability of mutating a
+                                     coefficient (one per solution by default)
+        :param mutation_scale: the max absolute change of a mutated
+                               coefficient (scaled like the bounds by default)
+        """
+        height, width, channels = image_shape(input_shape)
+        scale = np.sqrt(height * width) / size
+        bound = noise_size * scale
+
+        super().__init__(input_shape, noise_size, (size, size, channels),
+                         -bound, bound,
+                         mutation_probability or 1 / size ** 2,
+                         mutation_scale or 0.02 * scale)
+
+        self.size = size
+
+        self._height_basis = dct_basis(size, height)
+        self._width_basis = dct_basis(size, width)
+
+    def _decode(self, variables):
+        """Applies the inverse DCT to the coefficients."""
+        return np.einsum('uh,nuvc,vw->nhwc', self._height_basis, variables,
+                         self._width_basis, optimize=True).astype('float32')
+
+    def variable_gradients(self, variables, gradients):
+        """Applies the (forward) DCT to the gradients, which is the adjoint of
+        the inverse DCT."""
+        gradients = gradients.reshape(len(variables), *self.image_shape)
+
+        return np.einsum('uh,nhwc,vw->nuvc', self._height_basis, gradients,
+                         self._width_basis, optimize=True)
+
+
+def image_shape(input_shape):
+    """
+    Returns the (height, width, channels) shape of images of the given input
+    shape. Flat inputs whose size is a square number are treated as square
+    single-channel images.
+
+    :raises ValueError: if the input shape doesn't describe an image
+    """
+    if len(input_shape) == 3:
+        return tuple(input_shape)
+
+    if len(input_shape) == 1:
+        side = math.isqrt(input_shape[0])
+
+        if side ** 2 == input_shape[0]:
+            return side, side, 1
+
+    raise ValueError(f'the input shape {tuple(input_shape)} is neither an '
+                     f'image shape nor a flat square image')
+
+
+def dct_basis(size, length):
+    """
+    Returns the first size orthonormal DCT-II basis vectors of the given
+    length.
+
+    :return: a (size, length) matrix whose u-th row is the u-th basis vector
+    """
+    frequencies = np.arange(size)[:, None]
+    positions = np.arange(length)[None, :]
+
+    basis = np.cos(np.pi * (2 * positions + 1) * frequencies / (2 * length))
+    basis *= np.sqrt(2 / length)
+    basis[0] /= np.sqrt(2)
+
+    return basis.astype('float32')
+
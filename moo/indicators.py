@@ -0,0 +1,224 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+def hypervolume(objectives, reference_point):
+    """
+    Returns the hypervolume dominated by the given objectives (for
+    minimization) and bounded by the reference point.
+
+    Points that do not strictly dominate the reference point are ignored.
+    Fronts with 2 objectives are measured by a sweep line in O(n log n) time
+    and fronts with 3 objectives by a sweep plane (see _hypervolume_3d),
+    while more objectives are sliced along the last one down to 3D fronts.
+
+    :param objectives: the objectives matrix, one row per solution
+    :param reference_point: the reference point
+    :return: the hypervolume
+    """
+    objectives = np.asarray(objectives, dtype='float64')
+    reference_point = np.asarray(reference_point, dtype='float64')
+
+    objectives = objectives[np.all(objectives < reference_point, axis=1)]
+
+    if not len(objectives):
+        return 0.0
+
+    if objectives.shape[1] == 1:
+        return float(reference_point[0] - objectives[:, 0].min())
+
+    if objectives.shape[1] == 2:
+        return _hypervolume_2d(objectives, reference_point)
+
+    if objectives.shape[1] == 3:
+        return _hypervolume_3d(objectives, reference_point)
+
+    objectives = objectives[np.argsort(objectives[:, -1], kind='stable')]
+    upper_bounds = np.append(objectives[1:, -1], reference_point[-1])
+
+    volume = 0.0
+
+    for i, depth in enumerate(upper_bounds - objectives[:, -1]):
+        if depth > 0:
+            volume += depth * hypervolume(objectives[:i + 1, :-1],
+                                          reference_point[:-1])
+
+    return volume
+
+
+def _hypervolume_2d(objectives, reference_point):
+    """Returns the hypervolume of 2D objectives using a sweep line.
+
+    Sorted by the first objective, every point adds the rectangle between
+    its second objective and the best second objective of its predecessors.
+    """
+    objectives = objectives[np.lexsort((objectives[:, 1], objectives[:, 0]))]
+
+    best_seconds = np.minimum.accumulate(objectives[:, 1])
+    upper_bounds = np.append(reference_point[1], best_seconds[:-1])
+
+    return float(np.sum((reference_point[0] - objectives[:, 0])
+                        * (upper_bounds - best_seconds)))
+
+
+def _hypervolume_3d(objectives, reference_point):
+    """
+    Returns the hypervolume of 3D objectives using a sweep plane.
+
+    Points are visited in ascending order of the third objective while the
+    2D front of the visited points is kept as a staircase sorted by the first
+    objective. The area dominated by the staircase is updated by the area
+    each point adds to it, so the volume is the sum of the areas times the
+    distances between consecutive points.
+
+    The staircase is searched by bisection, but kept in Python lists whose
+    insertions shift the following points, so the worst case takes O(n^2)
+    time rather than the O(n log n) of a balanced tree. The shifts are fast
+    memory moves though, so fronts of up to ~50000 points are measured in
+    close to linear time.
+
+    Beume, Nicola, et al. "On the complexity of computing the hypervolume
+    indicator." IEEE Transactions on Evolutionary Computation 13.5 (2009):
+    1075-1082.
+    """
+    objectives = objectives[np.argsort(objectives[:, 2], kind='stable')]
+    upper_bounds = np.append(objectives[1:, 2], reference_point[2]).tolist()
+
+    reference_first, reference_second = reference_point[:2].tolist()
+
+    # the staircase, with the second objectives negated to ascend as well
+    firsts = []
+    negated_seconds = []
+
+    area = 0.0
+    volume = 0.0
+
+    for (first, second, third), upper_bound in zip(objectives.tolist(),
+                                                   upper_bounds):
+        predecessor = bisect_right(firsts, first)
+
+        if not predecessor or -negated_seconds[predecessor - 1] > second:
+            start = bisect_left(firsts, first)
+            end = bisect_right(negated_seconds, -second, lo=start)
+
+            # the added area consists of vertical strips, bounded from above
+            # by the predecessor or by the removed points
+            left = first
+            top = (-negated_seconds[start - 1] if start
+                   else reference_second)
+
+            for i in range(start, end):
+                area += (firsts[i] - left) * (top - second)
+                left, top = firsts[i], -negated_seconds[i]
+
+            right = firsts[end] if end < len(firsts) else reference_first
+            area += (right - left) * (top - second)
+
+            firsts[start:end] = [first]
+            negated_seconds[start:end] = [-second]
+
+        volume += area * (upper_bound - third)
+
+    return volume
+
+
+def _distances(first, second):
+    """Returns the matrix of Euclidean distances between the rows of the
+    given objectives matrices."""
+    return np.linalg.norm(first[:, None] - second[None, :], axis=2)
+
+
+def igd(objectives, reference_front):
+    """
+    Returns the inverted generational distance of the given objectives, i.e.
+    the mean distance from every point of a reference front to its closest
+    point among the objectives.
+
+    :param objectives: the objectives matrix, one row per solution
+    :param reference_front: the objectives of a reference (ideally the true
+                            Pareto) front, one row per point
+    :return: the IGD or inf if there are no objectives
+    """
+    objectives = np.asarray(objectives, dtype='float64')
+    reference_front = np.asarray(reference_front, dtype='float64')
+
+    if not len(objectives):
+        return float('inf')
+
+    return float(np.mean(np.min(_distances(reference_front, objectives),
+                                axis=1)))
+
+
+def _nearest_neighbour_distances(objectives, metric='euclidean'):
+    """Returns the distance from every point to its nearest other point."""
+    if metric == 'manhattan':
+        distances = np.sum(np.abs(objectives[:, None] - objectives[None, :]),
+                           axis=2)
+    else:
+        distances = _distances(objectives, objectives)
+
+    np.fill_diagonal(distances, np.inf)
+
+    return np.min(distances, axis=1)
+
+
+def spacing(objectives):
+    """
+    Returns Schott's spacing of the given objectives, i.e. the standard
+    deviation of the Manhattan distances from every point to its nearest
+    neighbour. Zero means the points are evenly spaced.
+
+    :param objectives: the objectives matrix, one row per solution
+    :return: the spacing or 0 if there are less than 2 points
+    """
+    objectives = np.asarray(objectives, dtype='float64')
+
+    if len(objectives) < 2:
+        return 0.0
+
+    return float(np.std(_nearest_neighbour_distances(objectives,
+                                                     'manhattan'), ddof=1))
+
+
+def spread(objectives, reference_front=None):
+    """
+    Returns the generalized spread (delta) of the given objectives, which
+    measures both the uniformity of the distances between neighbouring
+    points and how far the points are from the extremes of a reference
+    front. Zero means the points are evenly spaced and reach the extremes.
+
+    Zhou, Aimin, et al. "Combining model-based and genetics-based offspring
+    generation for multi-objective optimization using a convergence
+    criterion." IEEE Congress on Evolutionary Computation (2006): 892-899.
+
+    :param objectives: the objectives matrix, one row per solution
+    :param reference_front: the objectives of a reference front, whose best
+                            point in every objective is an extreme, or None
+                            to only measure the uniformity
+    :return: the spread or 0 if there are less than 2 points
+    """
+    objectives = np.asarray(objectives, dtype='float64')
+
+    if len(objectives) < 2:
+        return 0.0
+
+    neighbour_distances = _nearest_neighbour_distances(objectives)
+    mean_distance = neighbour_distances.mean()
+
+    extreme_distances = 0.0
+
+    if reference_front is not None:
+        reference_front = np.asarray(reference_front, dtype='float64')
+        extremes = reference_front[np.argmin(reference_front, axis=0)]
+        extreme_distances = np.sum(np.min(_distances(extremes, objectives),
+                                          axis=1))
+
+    denominator = extreme_distances + len(objectives) * mean_distance
+
+    if denominator <= 0:
+        return 0.0
+
+    return float((extreme_distances
+                  + np.sum(np.abs(neighbour_distances - mean_distance)))
+                 / denominator)
@@ -0,0 +1,253 @@
+import multiprocessing
+import traceback
+
+import numpy as np
+
+from moo.algorithm import Algorithm
+from moo.archive import nondominated
+from moo.population.population import Population
+
+
+def _columns(population):
+    """Returns a dict of the column matrices of the given population."""
+    return {column: getattr(population, column)
+            for column in population.COLUMNS}
+
+
+class Migration:
+    """Exchanges the non-dominated solutions of an island's algorithm with
+    the other islands of an IslandModel.
+
+    Attributes:
+        connection: the connection to the IslandModel
+        interval: the number of generations between migrations
+        num_migrants: the max number of solutions sent per migration
+    """
+
+    def __init__(self, connection, interval, num_migrants):
+        """Initializes Migration attributes."""
+        self.connection = connection
+        self.interval = interval
+        self.num_migrants = num_migrants
+
+    def exchange(self, algorithm, iteration, front):
+        """
+        Sends random members of the current non-dominated set to the island
+        model and receives solutions of another island, if a migration is
+        due after the given generation.
+
+        :return: a tuple of the received solutions (a population of the
+                 front's class) or None, and the reason why the run should
+                 stop or None
+        """
+        if (iteration + 1) % self.interval:
+            return None, None
+
+        emigrants = front[np.sort(algorithm.rng.choice(
+            len(front), min(self.num_migrants, len(front)), replace=False))]
+        self.connection.send(('migrate', _columns(emigrants)))
+
+        message, content = self.connection.recv()
+
+        if message == 'stop':
+            return None, content
+
+        if content is None:
+            return None, None
+
+        return type(front).from_columns(algorithm.problem, content), None
+
+
+def _run_island(connection, algorithm_factory, interval, num_migrants):
+    """Runs the algorithm of an island for every run requested by the
+    island model, until it sends None."""
+    try:
+        algorithm = algorithm_factory()
+        algorithm.migration = Migration(connection, interval, num_migrants)
+
+        while True:
+            request = connection.recv()
+
+            if request is None:
+                return
+
+            orig_image, label, seed = request
+
+            algorithm.rng = np.random.default_rng(seed)
+            algorithm.problem.reset_o_extremes()
+
+            result = algorithm.run(orig_image, label)
+
+            connection.send(('done', (_columns(result), {
+                'iterations': algorithm.iterations,
+                'stop_reason': algorithm.stop_reason,
+                'evaluations': algorithm.evaluations,
+                'model_calls': algorithm.model_calls,
+            })))
+    except Exception:
+        connection.send(('error', traceback.format_exc()))
+
+
+class IslandModel(Algorithm):
+    """Runs several algorithms on the same problem in separate processes,
+    which exchange their best solutions every few generations.
+
+    Each island evolves its own population with an algorithm returned by the
+    factory (e.g. an NSGA2 or SPEA2 instance), so an island model of k
+    islands of size N sorts k populations of N solutions in parallel instead
+    of one population of k * N solutions. After every migration interval,
+    every island sends random members of its non-dominated set to the next
+    island of a ring, where they compete for survival with the island's
+    population. Once any island stops early, e.g. because its attack
+    succeeded, the other islands stop at the next migration. The result is
+    the non-dominated set of the islands' merged results.
+
+    The island processes are started on the first run and reused by later
+    runs. The factory is called in every island process, so it has to be
+    picklable (e.g. a module-level function or functools.partial).
+
+    Attributes:
+        algorithm_factory: a function returning the algorithm of an island
+        num_islands: the number of islands
+        migration_interval: the number of generations between migrations
+        num_migrants: the max number of solutions an island sends per
+                      migration
+    """
+
+    def __init__(self, problem, algorithm_factory, num_islands=4,
+                 migration_interval=5, num_migrants=5, rng=None):
+        """
+        Initializes IslandModel attributes.
+
+        :param problem: the problem solved by the islands, used to
+                        interpret the results in this process
+        """
+        super().__init__(problem, None, None, rng=rng)
+
+        self.algorithm_factory = algorithm_factory
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+
+        self._connections = []
+        self._processes = []
+
+    def run(self, orig_image, label):
+        """Executes the algorithm on all islands."""
+        self._start(orig_image, label)
+        self._start_islands()
+
+        seeds = self.rng.integers(2 ** 63, size=self.num_islands)
+
+        for connection, seed in zip(self._connections, seeds):
+            connection.send((orig_image, label, int(seed)))
+
+        results = []
+        active = list(range(self.num_islands))
+        stop_reason = None
+
+        while active:
+            messages = {island: self._receive(island) for island in active}
+            migrating = []
+
+            for island in active:
+                message, content = messages[island]
+
+                if message == 'migrate':
+                    migrating.append(island)
+                    continue
+
+                results.append(content)
+
+                if content[1]['stop_reason'] != 'max_iterations':
+                    stop_reason = stop_reason or content[1]['stop_reason']
+
+            # every migrating island receives the emigrants of the previous
+            # migrating island of the ring
+            for position, island in enumerate(migrating):
+                if stop_reason is not None:
+                    reply = ('stop', stop_reason)
+                elif len(migrating) == 1:
+                    reply = ('immigrants', None)
+                else:
+                    reply = ('immigrants',
+                             messages[migrating[position - 1]][1])
+
+                self._connections[island].send(reply)
+
+            active = migrating
+
+        return self._finish(self._merge(results, stop_reason))
+
+    def iterate(self, orig_image, label):
+        """Executes the algorithm on all islands. The islands evaluate their
+        populations themselves, so no population is yielded."""
+        yield from ()
+        return self.run(orig_image, label)
+
+    def close(self):
+        """Stops the island processes."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except OSError:
+                # the island already exited after an error
+                pass
+
+        for process in self._processes:
+            process.join()
+
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        """Returns the island model."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Stops the island processes."""
+        self.close()
+
+    def _start_islands(self):
+        """Starts the island processes, unless they are running."""
+        if self._processes:
+            return
+
+        context = multiprocessing.get_context('spawn')
+
+        for _ in range(self.num_islands):
+            connection, island_connection = context.Pipe()
+            process = context.Process(
+                target=_run_island,
+                args=(island_connection, self.algorithm_factory,
+                      self.migration_interval, self.num_migrants),
+                daemon=True)
+            process.start()
+
+            self._connections.append(connection)
+            self._processes.append(process)
+
+    def _receive(self, island):
+        """Returns the next message of the given island."""
+        message, content = self._connections[island].recv()
+
+        if message == 'error':
+            raise RuntimeError(f'island {island} failed:\n{content}')
+
+        return message, content
+
+    def _merge(self, results, stop_reason):
+        """Returns the non-dominated set of the islands' results and sums up
+        their counters."""
+        self.iterations = max(stats['iterations'] for _, stats in results)
+        self.stop_reason = stop_reason or 'max_iterations'
+        self.evaluations = sum(stats['evaluations'] for _, stats in results)
+        self.model_calls = sum(stats['model_calls'] for _, stats in results)
+
+        merged = Population.from_columns(self.problem, {
+            column: np.concatenate([columns[column]
+                                    for columns, _ in results])
+            for column in Population.COLUMNS})
+        self.problem._update_o_extremes(merged)
+
+        return nondominated(merged)
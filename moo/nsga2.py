@@ -1,65 +1,100 @@
-import math
+import numpy as np
 
 from moo import operators
-from moo.solution.nsga2_solution import NSGA2Solution
+from moo.algorithm import Algorithm, PhaseTimer
+from moo.population.nsga2_population import NSGA2Population
 
 
-class NSGA2:
+class NSGA2(Algorithm):
     """An implementation of NSGA-II.
 
     Attributes:
         problem: the multi-objective optimization problem to solve
         pop_size: the size of the population
         max_iterations: the maximum number of algorithm iterations
+        observers: a list of Observers notified about runs & generations
+        rng: the np.random.Generator used for all random decisions
+        stopping_criteria: a list of StoppingCriteria that can end a run early
+        archive_front: if True, runs return every non-dominated solution
+                       evaluated during the run
+        refinement: a GradientRefinement applied to offspring or None
+        tile_size: the number of rows of the domination matrix computed at
+                   once, or None to compute the whole matrix
     """
 
-    def __init__(self, problem, pop_size, max_iterations):
-        """Initializes NSGA2 attributes."""
-        self.problem = problem
-        self.pop_size = pop_size
-        self.max_iterations = max_iterations
+    def iterate(self, orig_image, label):
+        """Executes the algorithm step by step."""
+        self._start(orig_image, label)
 
-    def run(self, orig_image, label):
-        """Executes the algorithm."""
-        population = self.initialize()
+        resumed = self._resume(population=NSGA2Population)
 
-        self.problem.evaluate(population, orig_image, label)
-        self.fast_non_dominated_sort(population)
+        if resumed is None:
+            population = self.initialize()
+
+            yield from self._evaluate(population)
+            self.fast_non_dominated_sort(population)
+
+            iteration = 0
+        else:
+            iteration, populations = resumed
+            population = populations['population']
 
-        iteration = 0
         while iteration < self.max_iterations:
-            # print(f'i={iteration}')
+            timer = PhaseTimer()
 
-            offspring = operators.reproduce(population)
-            self.problem.evaluate(offspring, orig_image, label)
+            with timer.phase('reproduction'):
+                offspring = operators.reproduce(population, self.rng)
 
-            fronts = self.fast_non_dominated_sort(population + offspring)
-            population = self.build_population(fronts)
+            self._refine(offspring, orig_image, label, timer)
 
-            iteration += 1
+            with timer.phase('evaluation'):
+                yield from self._evaluate(offspring)
+
+            with timer.phase('sorting'):
+                union = population + offspring
+                fronts = self.fast_non_dominated_sort(union)
+
+            with timer.phase('selection'):
+                population = self.build_population(union, fronts)
+
+            if self._end_generation(
+                    iteration, timer, population[population.rank == 0], label,
+                    front_sizes=[len(front) for front in fronts]):
+                break
 
-        first_front = self.fast_non_dominated_sort(population)[0]
+            immigrants = self._take_immigrants()
 
-        return first_front
+            if immigrants is not None:
+                union = population + immigrants
+                population = self.build_population(
+                    union, self.fast_non_dominated_sort(union))
+
+            self._save_checkpoint(iteration, population=population)
+
+            iteration += 1
+
+        return self._finish(self._result(population))
 
     def initialize(self):
         """Returns the initial population."""
-        return [NSGA2Solution(self.problem) for _ in range(self.pop_size)]
+        return NSGA2Population(self.problem, self.pop_size, rng=self.rng)
 
-    def build_population(self, fronts):
-        """Builds a population from the given fronts."""
-        population = []
+    def build_population(self, union, fronts):
+        """Builds a population from the given fronts of the union."""
+        selected = []
+        fill_count = self.pop_size
 
         for front in fronts:
-            if len(population) + len(front) > self.pop_size:
-                front.sort(reverse=True)
-                fill_count = self.pop_size - len(front)
-                population += front[:fill_count]
+            if len(front) > fill_count:
+                order = np.argsort(-union.crowding_distance[front],
+                                   kind='stable')
+                selected.append(front[order[:fill_count]])
                 break
 
-            population += front
+            selected.append(front)
+            fill_count -= len(front)
 
-        return population
+        return union[np.concatenate(selected)]
 
     def fast_non_dominated_sort(self, population):
         """
@@ -67,64 +102,49 @@ class NSGA2:
         the given population.
 
         :param population: the population to sort
-        :return: the fronts
+        :return: the fronts, as arrays of indices into the population
         """
-        current_front = []
-
-        for solution in population:
-            solution.dominates_list = []
-            solution.dominated_by = 0
-
-            for candidate in population:
-                if solution.dominates(candidate):
-                    solution.dominates_list.append(candidate)
-                elif candidate.dominates(solution):
-                    solution.dominated_by += 1
-
-            if solution.dominated_by == 0:
-                current_front.append(solution)
-                solution.rank = 0
+        dominates, dominated_by = self._domination(population)
 
         fronts = []
-        front_index = 0
+        current_front = np.flatnonzero(dominated_by == 0)
 
-        while current_front:
-            self.crowding_distance_assignment(current_front)
+        while len(current_front):
+            population.rank[current_front] = len(fronts)
+            self.crowding_distance_assignment(population, current_front)
             fronts.append(current_front)
-            next_front = []
 
-            for solution in current_front:
-                for dominated in solution.dominates_list:
-                    dominated.dominated_by -= 1
+            dominated_by[current_front] = -1
 
-                    if dominated.dominated_by == 0:
-                        next_front.append(dominated)
-                        dominated.rank = front_index + 1
+            for _, rows in self._domination_rows(dominates, current_front,
+                                                 len(population)):
+                dominated_by -= rows.sum(axis=0)
 
-            current_front = next_front
-            front_index += 1
+            current_front = np.flatnonzero(dominated_by == 0)
 
         return fronts
 
-    def crowding_distance_assignment(self, front):
+    def crowding_distance_assignment(self, population, front):
         """
         Assigns crowding distance values to all solutions in the given front.
 
-        :param front: the front containing solutions
+        :param population: the population containing the front
+        :param front: the indices of solutions in the front
         """
-        for solution in front:
-            solution.crowding_distance = 0
+        objectives = population.objectives[front]
+        distances = np.zeros(len(front))
 
-        front[0].crowding_distance = math.inf
-        front[-1].crowding_distance = math.inf
+        max_diffs = self.problem.o_maxs - self.problem.o_mins
 
         for i in range(self.problem.num_objectives):
-            front.sort(key=lambda ind: ind.objectives[i])
+            order = np.argsort(objectives[:, i], kind='stable')
+            sorted_objectives = objectives[order, i]
 
-            for j in range(1, len(front) - 1):
-                neighbors_diff = (front[j + 1].objectives[i]
-                                  - front[j - 1].objectives[i])
+            if max_diffs[i] > 0:
+                neighbors_diffs = (sorted_objectives[2:]
+                                   - sorted_objectives[:-2])
+                distances[order[1:-1]] += neighbors_diffs / max_diffs[i]
 
-                max_diff = self.problem.o_maxs[i] - self.problem.o_mins[i]
+            distances[order[[0, -1]]] = np.inf
 
-                front[j].crowding_distance += neighbors_diff / max_diff
+        population.crowding_distance[front] = distances
@@ -0,0 +1,104 @@
+import cProfile
+import json
+import os
+
+
+class Observer:
+    """The base class for observers notified by MOO algorithms.
+
+    Attributes:
+        tags: extra fields describing the current run (e.g. the sample index)
+    """
+
+    def __init__(self):
+        """Initializes Observer attributes."""
+        self.tags = {}
+
+    def on_run_start(self, algorithm, orig_image, label):
+        """Called before the algorithm starts a run."""
+
+    def on_generation(self, algorithm, stats):
+        """
+        Called after every generation.
+
+        :param algorithm: the running algorithm
+        :param stats: a dict of generation statistics - the iteration, the
+                      wall times of the generation phases, the numbers of
+                      evaluations & model calls, front or archive sizes and
+                      the hypervolume of the current non-dominated set
+        """
+
+    def on_run_end(self, algorithm, result):
+        """Called with the final result after the algorithm finishes a run."""
+
+
+class ProgressObserver(Observer):
+    """Prints a one-line summary of every generation."""
+
+    def on_generation(self, algorithm, stats):
+        """Prints the iteration, front size, hypervolume & total time."""
+        print(f'i={stats["iteration"]} front={stats["front_size"]} '
+              f'hv={stats["hypervolume"]:.4g} '
+              f't={sum(stats["times"].values()):.3f}s')
+
+
+class JsonLinesObserver(Observer):
+    """Appends the statistics of every generation to a JSON lines file.
+
+    Attributes:
+        path: the path of the JSON lines file
+    """
+
+    def __init__(self, path):
+        """Initializes JsonLinesObserver attributes."""
+        super().__init__()
+
+        self.path = path
+        self._file = None
+
+    def on_run_start(self, algorithm, orig_image, label):
+        """Opens the JSON lines file."""
+        self._file = open(self.path, 'a')
+        self.tags['label'] = int(label) if label is not None else None
+
+    def on_generation(self, algorithm, stats):
+        """Writes the given statistics as a single line."""
+        self._file.write(json.dumps({**self.tags, **stats}) + '\n')
+        self._file.flush()
+
+    def on_run_end(self, algorithm, result):
+        """Closes the JSON lines file."""
+        self._file.close()
+        self._file = None
+
+
+class ProfilingObserver(Observer):
+    """Profiles every run with cProfile and dumps the statistics to a file.
+
+    Attributes:
+        path_pattern: the dump path, formatted with the tags & the run index
+    """
+
+    def __init__(self, path_pattern='run{run}.prof'):
+        """Initializes ProfilingObserver attributes."""
+        super().__init__()
+
+        self.path_pattern = path_pattern
+        self._profile = None
+        self._run = 0
+
+    def on_run_start(self, algorithm, orig_image, label):
+        """Starts profiling."""
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    def on_run_end(self, algorithm, result):
+        """Stops profiling and dumps the statistics."""
+        self._profile.disable()
+
+        path = self.path_pattern.format(run=self._run, pid=os.getpid(),
+                                        **self.tags)
+        self._profile.dump_stats(path)
+
+        self._profile = None
+        self._run += 1
@@ -1,59 +1,67 @@
-import random
-
 import numpy as np
 
 
-def reproduce(parents):
-    """Reproduces the given parent population."""
-    offspring = []
+def reproduce(parents, rng, size=None):
+    """
+    Reproduces the given parent population.
 
-    while len(offspring) < len(parents):
-        first_parent, second_parent = select(parents), select(parents)
-        children = cross(first_parent, second_parent)
+    Parents are paired by batched binary tournaments and each pair produces
+    two children, which are interleaved in the offspring population.
 
-        for child in children:
-            mutate(child)
-            offspring.append(child)
+    Crossover & mutation are performed by the operators of the problem's
+    encoding.
 
-    return offspring
+    :param parents: the parent population
+    :param rng: the np.random.Generator to draw from
+    :param size: the number of offspring (the size of the parent population
+                 by default)
+    :return: the offspring population
+    """
+    encoding = parents.problem.encoding
+    size = len(parents) if size is None else size
+    num_pairs = (size + 1) // 2
 
+    first_children, second_children = encoding.cross(
+        parents.variables[select(parents, num_pairs, rng)],
+        parents.variables[select(parents, num_pairs, rng)], rng)
 
-def select(population, tournament_size=2):
-    """Returns a solution selected from the given population."""
-    best = None
+    variables = np.empty((2 * num_pairs, *parents.variables.shape[1:]),
+                         dtype=parents.variables.dtype)
+    variables[0::2] = first_children
+    variables[1::2] = second_children
+    variables = variables[:size]
 
-    for _ in range(tournament_size):
-        random_solution = random.choice(population)
+    encoding.mutate(variables, rng)
 
-        if best is None or random_solution > best:
-            best = random_solution
+    return parents.__class__(parents.problem, variables=variables)
 
-    return best
 
+def select(population, size, rng, tournament_size=2):
+    """Returns the indices of size solutions selected from the given
+    population by tournament selection."""
+    candidates = rng.integers(len(population), size=(tournament_size, size))
+    best = candidates[0]
 
-def mutate(solution, p=0.02):
-    """Mutates the given solution."""
-    num_variables = solution.problem.num_variables
+    for challenger in candidates[1:]:
+        best = np.where(population.better(challenger, best), challenger, best)
 
-    perturbation = np.random.uniform(-0.02, 0.02, num_variables)
-    to_perturb = (np.random.uniform(size=num_variables) < p).astype('float32')
+    return best
 
-    solution.variables += perturbation * to_perturb
 
+def mutate(variables, rng, p=0.02, scale=0.02):
+    """Mutates the given decision variables matrix in place."""
+    to_perturb = rng.random(variables.shape, dtype='float32') < p
 
-def cross(parent_1, parent_2, p=0.5):
-    """Performs uniform crossover on the given parent solutions."""
-    num_variables = parent_1.problem.num_variables
-    parent_class = parent_1.__class__
+    variables[to_perturb] += rng.uniform(-scale, scale,
+                                         np.count_nonzero(to_perturb))
 
-    to_cross = (np.random.uniform(size=num_variables) < p).astype('float32')
 
-    variables = (to_cross * parent_1.variables
-                 + (1 - to_cross) * parent_2.variables)
-    first_child = parent_class(parent_1.problem, variables)
+def cross(parents_1, parents_2, rng, p=0.5):
+    """Performs uniform crossover on the given parent decision variables
+    matrices."""
+    to_cross = rng.random(parents_1.shape, dtype='float32') < p
 
-    variables = ((1 - to_cross) * parent_1.variables
-                 + to_cross * parent_2.variables)
-    second_child = parent_class(parent_1.problem, variables)
+    first_children = np.where(to_cross, parents_1, parents_2)
+    second_children = np.where(to_cross, parents_2, parents_1)
 
-    return first_child, second_child
+    return first_children, second_children
@@ -0,0 +1,36 @@
+import numpy as np
+
+from moo.population.population import Population
+
+
+class NSGA2Population(Population):
+    """Models an NSGA2 population.
+
+    Attributes:
+        crowding_distance: the crowding distance value of each solution
+        rank: the rank of each solution
+    """
+    COLUMNS = Population.COLUMNS + ('crowding_distance', 'rank')
+
+    def __init__(self, problem, size=0, variables=None, rng=None):
+        """Initializes NSGA2Population attributes.
+
+        If the given decision variables matrix is None, a matrix of size rows
+        will be initialized with random values.
+
+        :param problem: an instance of Problem - the MOOP to optimize
+        :param size: the number of solutions to initialize randomly
+        :param variables: the decision variables matrix
+        :param rng: the np.random.Generator used for random initialization
+        """
+        super().__init__(problem, size, variables, rng)
+
+        self.crowding_distance = np.full(len(self), -1, dtype='float32')
+        self.rank = np.full(len(self), -1)
+
+    def better(self, i, j):
+        """Applies the crowding-comparison operator to the i-th and j-th
+        solutions."""
+        return (self.rank[i] < self.rank[j]) \
+            | (self.rank[i] == self.rank[j]) \
+            & (self.crowding_distance[i] > self.crowding_distance[j])
@@ -0,0 +1,127 @@
+from typing import ClassVar
+
+import numpy as np
+
+
+class Population:
+    """Models a population of multi-objective optimization problem solutions.
+
+    Solutions are stored row-wise in contiguous matrices - the i-th solution
+    is described by the i-th row of every column listed in COLUMNS.
+
+    Attributes:
+        problem: an instance of Problem - the MOOP to optimize
+        variables: the decision variables matrix, one row per solution
+        objectives: the objectives matrix, one row per solution
+        predictions: the model predictions matrix, one row per solution
+    """
+    COLUMNS: ClassVar[tuple] = ('variables', 'objectives', 'predictions')
+
+    def __init__(self, problem, size=0, variables=None, rng=None):
+        """Initializes Population attributes.
+
+        If the given decision variables matrix is None, a matrix of size rows
+        will be initialized with random values.
+
+        :param problem: an instance of Problem - the MOOP to optimize
+        :param size: the number of solutions to initialize randomly
+        :param variables: the decision variables matrix
+        :param rng: the np.random.Generator used for random initialization
+        """
+        self.problem = problem
+
+        if variables is None:
+            shape = (size, *np.atleast_1d(problem.num_variables))
+            variables = np.random.default_rng(rng).uniform(
+                problem.mins, problem.maxs, shape)
+
+        self.variables = np.asarray(variables, dtype='float32')
+        self.objectives = np.zeros(
+            (len(self.variables), problem.num_objectives), dtype='float32')
+        self.predictions = np.zeros(
+            (len(self.variables), problem.num_outputs), dtype='float32')
+
+    @classmethod
+    def from_columns(cls, problem, columns):
+        """
+        Returns a population built from the given column matrices.
+
+        :param problem: an instance of Problem - the MOOP to optimize
+        :param columns: a dict mapping every name in COLUMNS to its matrix
+        """
+        population = cls.__new__(cls)
+        population.problem = problem
+
+        for column in cls.COLUMNS:
+            setattr(population, column, columns[column])
+
+        return population
+
+    def __len__(self):
+        """Returns the number of solutions in this population."""
+        return len(self.variables)
+
+    def __getitem__(self, indices):
+        """Returns a new population containing the indexed solutions."""
+        return self.from_columns(self.problem, {
+            column: getattr(self, column)[indices]
+            for column in self.COLUMNS})
+
+    def __add__(self, other):
+        """Returns a new population containing solutions of both
+        populations."""
+        return self.from_columns(self.problem, {
+            column: np.concatenate((getattr(self, column),
+                                    getattr(other, column)))
+            for column in self.COLUMNS})
+
+    def dominates(self, i, j):
+        """Returns True if the i-th solution dominates the j-th solution."""
+        first, second = self.objectives[i], self.objectives[j]
+
+        return np.all(first <= second) and np.any(first < second)
+
+    def domination_matrix(self, rows=None):
+        """
+        Returns the domination matrix of this population, or the given rows
+        of it.
+
+        :param rows: the indices (or a slice) of the solutions whose rows are
+                     returned, or None for all solutions
+        :return: a boolean matrix whose element (i, j) is True if the i-th
+                 (given) solution dominates the j-th solution
+        """
+        first = self.objectives if rows is None else self.objectives[rows]
+
+        not_worse = np.ones((len(first), len(self)), dtype=bool)
+        better = np.zeros((len(first), len(self)), dtype=bool)
+
+        for first_objective, objective in zip(first.T, self.objectives.T):
+            not_worse &= first_objective[:, None] <= objective[None, :]
+            better |= first_objective[:, None] < objective[None, :]
+
+        return not_worse & better
+
+    def distance_matrix(self, rows=None, columns=None):
+        """
+        Returns the matrix of Euclidean distances between the objectives of
+        every pair of solutions in this population, or the given rows &
+        columns of it.
+
+        :param rows: the indices (or a slice) of the row solutions, or None
+                     for all solutions
+        :param columns: the indices (or a slice) of the column solutions, or
+                        None for all solutions
+        """
+        first = self.objectives if rows is None else self.objectives[rows]
+        second = (self.objectives if columns is None
+                  else self.objectives[columns])
+
+        squared_distances = np.zeros((len(first), len(second)),
+                                     dtype='float32')
+
+        for first_objective, objective in zip(first.T, second.T):
+            squared_distances += (first_objective[:, None]
+                                  - objective[None, :]) ** 2
+
+        return np.sqrt(squared_distances)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from moo.population.population import Population
+
+
+class SPEA2Population(Population):
+    """Models a SPEA2 population.
+
+    Attributes:
+        strength: the number of solutions that each solution dominates
+        density: the inverse of the distance to the k-th nearest solution
+        raw_fitness: the sum of the strengths of each solution's dominators
+        fitness: a sum of the density and raw fitness of each solution
+    """
+    COLUMNS = Population.COLUMNS + ('strength', 'density', 'raw_fitness',
+                                    'fitness')
+
+    def __init__(self, problem, size=0, variables=None, rng=None):
+        """Initializes SPEA2Population attributes.
+
+        If the given decision variables matrix is None, a matrix of size rows
+        will be initialized with random values.
+
+        :param problem: an instance of Problem - the MOOP to optimize
+        :param size: the number of solutions to initialize randomly
+        :param variables: the decision variables matrix
+        :param rng: the np.random.Generator used for random initialization
+        """
+        super().__init__(problem, size, variables, rng)
+
+        self.strength = np.zeros(len(self), dtype='int64')
+
+        self.density = np.full(len(self), -1, dtype='float32')
+        self.raw_fitness = np.full(len(self), -1, dtype='float32')
+        self.fitness = np.full(len(self), -1, dtype='float32')
+
+    def better(self, i, j):
+        """Applies the fitness comparison operator (for minimization) to the
+        i-th and j-th solutions."""
+        return self.fitness[i] < self.fitness[j]
@@ -0,0 +1,278 @@
+from abc import abstractmethod
+from concurrent.futures import Future
+from typing import ClassVar
+
+import numpy as np
+
+from moo.encodings import DenseEncoding
+from moo.problem.problem import Evaluation, Problem
+
+
+class AttackProblem(Problem):
+    """The base class for MOO problems that attack image recognition models.
+
+    Solutions are evaluated in batches - the clipped perturbations of the whole
+    population are stacked and passed to the model in as few forward passes as
+    the batch size allows. The decision variables of solutions describe the
+    perturbations in the problem's encoding, dense by default.
+
+    The images of a population are submitted to the problem's executor as a
+    single batch, so the inference can be spread across threads, processes
+    or an inference server. Without an executor, the model is called
+    directly.
+
+    Attributes:
+        model: the AttackModel to attack
+        batch_size: the max number of images per forward pass (None for all)
+        executor: the Executor running the model inference or None
+    """
+    NUM_OBJECTIVES: ClassVar[int]
+    WORST_PROBABILITY_OBJECTIVES: ClassVar[tuple]
+    TARGETED: ClassVar[bool]
+
+    def __init__(self, model, noise_size, batch_size=None, cache_size=None,
+                 encoding=None, executor=None):
+        """Initializes AttackProblem attributes."""
+        encoding = encoding or DenseEncoding(model.INPUT_SHAPE, -noise_size,
+                                             noise_size)
+
+        super().__init__(encoding.num_variables, self.NUM_OBJECTIVES,
+                         encoding.mins, encoding.maxs, cache_size=cache_size,
+                         encoding=encoding)
+
+        self.model = model
+        self.batch_size = batch_size
+        self.executor = executor
+        self.num_outputs = model.NUM_OUTPUTS
+
+        max_noise_strength = noise_size * np.sqrt(np.prod(model.INPUT_SHAPE))
+        self.reference_point = np.array(
+            self.WORST_PROBABILITY_OBJECTIVES + (max_noise_strength, ))
+
+    def evaluate(self, population, orig_image, label):
+        """Evaluates solutions in the given population."""
+        if not len(population):
+            return
+
+        perturbations = self.perturbations(population.variables, orig_image)
+        predictions = self._predict(perturbations, orig_image, label)
+
+        self._assign(population, perturbations, predictions, label)
+
+    def submit(self, population, orig_image, label):
+        """
+        Submits the images of the given population to the executor without
+        waiting for the predictions, so several populations can be evaluated
+        concurrently. Without an executor, the population is evaluated
+        synchronously.
+
+        :return: the pending Evaluation of the population
+        """
+        if not len(population) or self.executor is None:
+            return super().submit(population, orig_image, label)
+
+        perturbations = self.perturbations(population.variables, orig_image)
+        images = orig_image + perturbations
+
+        def assign(predictions):
+            self._assign(population, perturbations, predictions, label)
+
+        if self.cache is None:
+            return Evaluation(population, self._submit_batch(images), assign)
+
+        keys = self.cache.keys(perturbations, orig_image, label)
+        predictions, missing = self.cache.lookup(keys)
+
+        def complete(new_predictions):
+            self.cache.store(missing, new_predictions, predictions)
+            assign(np.array(predictions))
+
+        if missing:
+            future = self._submit_batch(
+                images[self.cache.first_indices(missing)])
+        else:
+            future = Future()
+            future.set_result([])
+
+        return Evaluation(population, future, complete)
+
+    def perturbations(self, variables, orig_image):
+        """
+        Returns the perturbations described by the given decision variables
+        matrix, clipped so the adversarial images stay in the valid pixel
+        range.
+
+        With the dense encoding, the variables are the perturbations, so
+        they are clipped in place.
+        """
+        perturbations = self.encoding.decode(variables)
+
+        raw_adv_images = orig_image + perturbations
+        perturbations -= raw_adv_images - np.clip(raw_adv_images, 0, 1)
+
+        return perturbations
+
+    def gradients(self, variables, orig_image, label):
+        """
+        Returns the gradients of the label probability objective with respect
+        to the given decision variables, computed in batched passes that are
+        counted as model calls.
+
+        With the dense encoding, the variables are clipped in place like in
+        perturbations.
+
+        :param variables: the decision variables matrix, one row per solution
+        :param orig_image: the attacked image
+        :param label: the attacked label
+        """
+        perturbations = self.perturbations(variables, orig_image)
+
+        # the objective is the label probability, negated when targeted
+        output_weights = np.zeros(self.num_outputs, dtype='float32')
+        output_weights[label] = -1.0 if self.TARGETED else 1.0
+
+        images = orig_image + perturbations
+        self._count_model_calls(images)
+
+        gradients = self.model.gradient_batch(images, output_weights,
+                                              self.batch_size)
+
+        return self.encoding.variable_gradients(
+            variables, gradients.reshape(perturbations.shape))
+
+    def _assign(self, population, perturbations, predictions, label):
+        """Assigns predictions & objectives to the solutions of the given
+        population."""
+        noise_strengths = np.sqrt(np.sum(
+            perturbations.reshape(len(population), -1) ** 2, axis=1))
+
+        population.predictions[:] = predictions
+        population.objectives[:] = self.objectives(predictions,
+                                                   noise_strengths, label)
+        self._update_o_extremes(population)
+
+    def is_successful(self, predictions, label):
+        """
+        Returns a boolean array telling which predictions mean a successful
+        attack - the label is recognized in a targeted attack, or any other
+        label is recognized in a non-targeted one.
+
+        :param predictions: the model predictions, one row per solution
+        :param label: the attacked label
+        """
+        recognized = np.argmax(predictions, axis=-1) == label
+
+        return recognized if self.TARGETED else ~recognized
+
+    def _predict(self, perturbations, orig_image, label):
+        """Returns model predictions for the adversarial images of the given
+        clipped perturbations, served from the cache where possible."""
+        images = orig_image + perturbations
+
+        if self.cache is None:
+            return self._predict_batch(images)
+
+        keys = self.cache.keys(perturbations, orig_image, label)
+
+        return self.cache.predict(keys, images, self._predict_batch)
+
+    def _predict_batch(self, images):
+        """Returns model predictions for the given images and counts the
+        forward passes."""
+        if self.executor is None:
+            self._count_model_calls(images)
+            return self.model.predict_batch(images, self.batch_size)
+
+        return self._submit_batch(images).result()
+
+    def _submit_batch(self, images):
+        """Submits the given images to the executor and counts the forward
+        passes.
+
+        :return: a Future of the predictions
+        """
+        self._count_model_calls(images)
+
+        return self.executor.submit(images, self.batch_size)
+
+    def _count_model_calls(self, images):
+        """Counts the batched passes needed to predict the given images or
+        compute their gradients."""
+        batch_size = self.batch_size or len(images)
+        self.model_calls += int(np.ceil(len(images) / batch_size))
+
+    @abstractmethod
+    def objectives(self, predictions, noise_strengths, label):
+        """
+        Returns the objectives of a batch of evaluated solutions.
+
+        :param predictions: the model predictions, one row per solution
+        :param noise_strengths: the L2 norms of the solutions' perturbations
+        :param label: the attacked label
+        :return: an array of objectives, one row per solution
+        """
+
+
+def evaluate_batch(problems, populations, orig_images, labels):
+    """
+    Evaluates the populations of several independent attacks on the same
+    model with a single batched model inference.
+
+    The images that are not served from the problems' caches are stacked,
+    passed to the model at once and the predictions are split back per
+    attack. Every problem counts the shared forward passes as its own.
+
+    :param problems: the AttackProblems of the attacks
+    :param populations: the populations to evaluate, one per attack
+    :param orig_images: the attacked images, one per attack
+    :param labels: the attacked labels, one per attack
+    """
+    attacks = [attack for attack in zip(problems, populations, orig_images,
+                                        labels)
+               if len(attack[1])]
+
+    if not attacks:
+        return
+
+    perturbations, lookups, requests = [], [], []
+
+    for problem, population, orig_image, label in attacks:
+        perturbations.append(problem.perturbations(population.variables,
+                                                   orig_image))
+        images = orig_image + perturbations[-1]
+
+        if problem.cache is None:
+            lookups.append(None)
+            requests.append(images)
+            continue
+
+        keys = problem.cache.keys(perturbations[-1], orig_image, label)
+        predictions, missing = problem.cache.lookup(keys)
+
+        lookups.append((predictions, missing))
+        requests.append(images[problem.cache.first_indices(missing)])
+
+    requester = attacks[0][0]
+    model_calls = requester.model_calls
+
+    if sum(map(len, requests)):
+        split = np.cumsum([len(request) for request in requests])[:-1]
+        new_predictions = np.split(
+            requester._predict_batch(np.concatenate(requests)), split)
+    else:
+        # every image was served from the caches
+        new_predictions = requests
+
+    model_calls = requester.model_calls - model_calls
+
+    for (problem, population, _, label), clipped, lookup, predictions in zip(
+            attacks, perturbations, lookups, new_predictions):
+        if problem is not requester:
+            problem.model_calls += model_calls
+
+        if lookup is not None:
+            cached, missing = lookup
+            problem.cache.store(missing, predictions, cached)
+            predictions = np.array(cached)
+
+        problem._assign(population, clipped, predictions, label)
@@ -0,0 +1,124 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+
+class EvaluationCache:
+    """A bounded LRU cache of model predictions keyed by perturbation content.
+
+    Keys combine a digest of the original image and the attacked label (the
+    scope) with a digest of the clipped perturbation, so entries of different
+    attacks never collide. Objectives are cheap to derive from predictions,
+    so only the predictions - the expensive part of an evaluation - are cached.
+
+    Attributes:
+        max_size: the maximum number of cached predictions
+        hits: the number of evaluations served without model inference
+        misses: the number of evaluations that required model inference
+    """
+
+    def __init__(self, max_size):
+        """Initializes EvaluationCache attributes."""
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """Returns the number of cached predictions."""
+        return len(self._entries)
+
+    @property
+    def hit_rate(self):
+        """Returns the fraction of evaluations served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @staticmethod
+    def _digest(array):
+        """Returns a digest of the given array's contents."""
+        return hashlib.blake2b(np.ascontiguousarray(array).tobytes(),
+                               digest_size=16).digest()
+
+    def keys(self, variables, orig_image, label):
+        """Returns the cache keys of the given clipped perturbations."""
+        scope = (self._digest(orig_image), int(label))
+        return [(scope, self._digest(row)) for row in variables]
+
+    def predict(self, keys, images, predict):
+        """
+        Returns predictions for the given images, running inference only for
+        images whose keys are neither cached nor repeated within the batch.
+
+        :param keys: the cache keys of the images
+        :param images: the images stacked along the first axis
+        :param predict: a function returning predictions for a batch of images
+        :return: the predictions, one row per image
+        """
+        predictions, missing = self.lookup(keys)
+
+        if missing:
+            self.store(missing, predict(images[self.first_indices(missing)]),
+                       predictions)
+
+        return np.array(predictions)
+
+    def lookup(self, keys):
+        """
+        Looks up the given keys in the cache.
+
+        :param keys: the cache keys of a batch of images
+        :return: a list of the cached predictions (None for missing ones) and
+                 an OrderedDict mapping every missing key to the positions of
+                 the images with that key in the batch
+        """
+        predictions = [None] * len(keys)
+        missing = OrderedDict()
+
+        for i, key in enumerate(keys):
+            cached = self._entries.get(key)
+
+            if cached is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                self._entries.move_to_end(key)
+                predictions[i] = cached
+
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        return predictions, missing
+
+    @staticmethod
+    def first_indices(missing):
+        """Returns the position of the first image of every missing key."""
+        return [indices[0] for indices in missing.values()]
+
+    def store(self, missing, new_predictions, predictions):
+        """
+        Caches the predictions of the missing keys returned by lookup and
+        fills them in the list of predictions.
+
+        :param missing: the missing keys returned by lookup
+        :param new_predictions: the predictions of the first image of every
+                                missing key, in order
+        :param predictions: the list of predictions returned by lookup
+        """
+        for (key, indices), prediction in zip(missing.items(),
+                                              new_predictions):
+            self._put(key, prediction)
+
+            for i in indices:
+                predictions[i] = prediction
+
+    def _put(self, key, prediction):
+        """Caches the given prediction, evicting the least recently used
+        one if the cache is full."""
+        self._entries[key] = prediction
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
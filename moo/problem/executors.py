@@ -0,0 +1,503 @@
+import multiprocessing
+import os
+import queue
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+
+class Executor(ABC):
+    """The base class for executors running the model inference of
+    AttackProblems.
+
+    A problem submits the images of a whole population at once and gathers
+    the predictions from the returned future, so executors are free to split
+    the batch across workers or to merge it with batches of other problems.
+    Executors are context managers that close themselves on exit.
+    """
+
+    @abstractmethod
+    def submit(self, images, batch_size=None):
+        """
+        Submits a batch of images for inference.
+
+        :param images: the model inputs stacked along the first axis
+        :param batch_size: the max number of images per forward pass (all
+                           images are passed at once if None)
+        :return: a concurrent.futures.Future of the predictions, one row per
+                 image
+        """
+
+    def predict(self, images, batch_size=None):
+        """Returns the predictions for the given batch of images."""
+        return self.submit(images, batch_size).result()
+
+    def close(self):
+        """Releases the resources held by the executor."""
+
+    def __enter__(self):
+        """Returns the executor."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the executor."""
+        self.close()
+
+
+def _resolved(function, *args):
+    """Returns a Future resolved with the result of the given call."""
+    future = Future()
+
+    try:
+        future.set_result(function(*args))
+    except Exception as error:
+        future.set_exception(error)
+
+    return future
+
+
+def _gather(futures):
+    """Returns a Future of the concatenated results of the given futures,
+    resolved once all of them are done."""
+    gathered = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def on_done(_):
+        with lock:
+            remaining[0] -= 1
+
+            if remaining[0]:
+                return
+
+        errors = [future.exception() for future in futures
+                  if future.exception() is not None]
+
+        if errors:
+            gathered.set_exception(errors[0])
+        else:
+            gathered.set_result(np.concatenate([future.result()
+                                                for future in futures]))
+
+    for future in futures:
+        future.add_done_callback(on_done)
+
+    return gathered
+
+
+def _chunks(images, num_chunks):
+    """Splits the given images into at most num_chunks similar chunks."""
+    return np.array_split(images, min(num_chunks, len(images)) or 1)
+
+
+class SerialExecutor(Executor):
+    """Runs model inference synchronously in the calling thread.
+
+    Attributes:
+        model: the model to run
+    """
+
+    def __init__(self, model):
+        """Initializes SerialExecutor attributes."""
+        self.model = model
+
+    def submit(self, images, batch_size=None):
+        """Predicts the images and returns a resolved future."""
+        return _resolved(self.model.predict_batch, images, batch_size)
+
+
+class ThreadExecutor(Executor):
+    """Splits every batch across a pool of threads sharing the model.
+
+    NumPy & TensorFlow release the GIL during the heavy computations, so the
+    chunks of a batch are predicted concurrently. The model must support
+    concurrent predictions, which NumpyNetwork does.
+
+    Attributes:
+        model: the model to run
+        num_workers: the number of threads
+    """
+
+    def __init__(self, model, num_workers=None):
+        """Initializes ThreadExecutor attributes."""
+        self.model = model
+        self.num_workers = num_workers or os.cpu_count()
+
+        self._pool = ThreadPoolExecutor(self.num_workers)
+
+    def submit(self, images, batch_size=None):
+        """Predicts the chunks of the images in the pool's threads."""
+        return _gather([self._pool.submit(self.model.predict_batch, chunk,
+                                          batch_size)
+                        for chunk in _chunks(images, self.num_workers)])
+
+    def close(self):
+        """Shuts down the pool."""
+        self._pool.shutdown()
+
+
+_network = None
+_memories = []
+
+
+def _share(array):
+    """Copies the given array to a new shared memory block.
+
+    :return: the SharedMemory and a (name, shape, dtype) descriptor of the
+             shared array
+    """
+    memory = shared_memory.SharedMemory(create=True,
+                                        size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=memory.buf)[...] = array
+
+    return memory, (memory.name, array.shape, array.dtype.str)
+
+
+def _init_process_worker(network_class, activations, layers):
+    """Rebuilds the shared network in a worker process, with read-only
+    weights backed by the parent's shared memory."""
+    global _network
+
+    _network = network_class(activations)
+
+    for layer_type, weights in layers:
+        arrays = []
+
+        for weight in weights:
+            if isinstance(weight, tuple):
+                name, shape, dtype = weight
+                memory = shared_memory.SharedMemory(name=name)
+                _memories.append(memory)
+
+                weight = np.ndarray(shape, dtype, buffer=memory.buf)
+                weight.flags.writeable = False
+
+            arrays.append(weight)
+
+        _network.layers.append((layer_type, arrays))
+
+
+def _predict_in_process(images, batch_size):
+    """Returns the predictions of the worker's network."""
+    return _network.predict(images, batch_size)
+
+
+class ProcessExecutor(Executor):
+    """Splits every batch across a pool of processes.
+
+    The weights of the model are copied once to shared memory, and every
+    worker maps them read-only instead of loading its own copy. Only models
+    using the numpy backend can be shared.
+
+    Attributes:
+        num_workers: the number of worker processes
+    """
+
+    def __init__(self, model, num_workers=None):
+        """Initializes ProcessExecutor attributes."""
+        if getattr(model, 'backend', None) != 'numpy':
+            raise ValueError('the process executor requires a model using '
+                             'the numpy backend')
+
+        self.num_workers = num_workers or os.cpu_count()
+
+        network = model.model
+        self._memories = []
+        layers = []
+
+        for layer_type, weights in network.layers:
+            shared = []
+
+            for weight in weights:
+                if isinstance(weight, np.ndarray):
+                    memory, weight = _share(weight)
+                    self._memories.append(memory)
+
+                shared.append(weight)
+
+            layers.append((layer_type, shared))
+
+        context = multiprocessing.get_context('spawn')
+        self._pool = context.Pool(
+            self.num_workers, _init_process_worker,
+            (type(network), network.activations, layers))
+
+    def submit(self, images, batch_size=None):
+        """Predicts the chunks of the images in the worker processes."""
+        futures = []
+
+        for chunk in _chunks(np.asarray(images), self.num_workers):
+            future = Future()
+            futures.append(future)
+
+            self._pool.apply_async(_predict_in_process, (chunk, batch_size),
+                                   callback=future.set_result,
+                                   error_callback=future.set_exception)
+
+        return _gather(futures)
+
+    def close(self):
+        """Shuts down the pool and frees the shared weights."""
+        self._pool.close()
+        self._pool.join()
+
+        for memory in self._memories:
+            memory.close()
+            memory.unlink()
+
+        self._memories = []
+
+
+class BatchingExecutor(Executor):
+    """Merges the batches submitted concurrently by several clients into
+    shared forward passes.
+
+    A background thread waits for submitted batches, keeps collecting the
+    batches that arrive within max_delay seconds (or until max_images images
+    are pending), predicts all of them at once and resolves their futures.
+    It is meant to serve concurrently running attacks, e.g. the clients of
+    an InferenceServer.
+
+    Attributes:
+        model: the model to run
+        batch_size: the max number of images per forward pass (None for all)
+        max_delay: the max time in seconds a batch waits for others
+        max_images: the number of pending images predicted without waiting
+        forward_passes: the number of merged predictions run so far
+    """
+
+    def __init__(self, model, batch_size=None, max_delay=0.005,
+                 max_images=None):
+        """Initializes BatchingExecutor attributes."""
+        self.model = model
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_images = max_images
+
+        self.forward_passes = 0
+
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def submit(self, images, batch_size=None):
+        """Queues the images to be predicted with other pending batches. The
+        executor's batch size is used instead of the given one."""
+        future = Future()
+        self._requests.put((np.asarray(images), future))
+
+        return future
+
+    def close(self):
+        """Stops the background thread after the pending batches."""
+        self._requests.put(None)
+        self._thread.join()
+
+    def _serve(self):
+        """Predicts merged batches until the executor is closed."""
+        while True:
+            request = self._requests.get()
+
+            if request is None:
+                return
+
+            requests = [request]
+            num_images = len(request[0])
+            closed = False
+
+            while self.max_images is None or num_images < self.max_images:
+                try:
+                    request = self._requests.get(timeout=self.max_delay)
+                except queue.Empty:
+                    break
+
+                if request is None:
+                    closed = True
+                    break
+
+                requests.append(request)
+                num_images += len(request[0])
+
+            self._predict(requests)
+
+            if closed:
+                return
+
+    def _predict(self, requests):
+        """Predicts the images of the given requests in one batch."""
+        images = [images for images, _ in requests]
+
+        try:
+            predictions = np.split(
+                self.model.predict_batch(np.concatenate(images),
+                                         self.batch_size),
+                np.cumsum([len(batch) for batch in images])[:-1])
+        except Exception as error:
+            for _, future in requests:
+                future.set_exception(error)
+            return
+
+        self.forward_passes += 1
+
+        for (_, future), batch_predictions in zip(requests, predictions):
+            future.set_result(batch_predictions)
+
+
+class InferenceServer:
+    """Serves the predictions of an executor over a local socket.
+
+    A stand-in for a remote inference service - every client connection is
+    handled by its own thread, which submits the received batches to the
+    executor (usually a BatchingExecutor, so the batches of all clients are
+    merged) and sends the predictions back as soon as they are ready.
+    Clients may pipeline requests.
+
+    Attributes:
+        executor: the Executor running the inference
+        address: the address of the server's socket
+        authkey: the key clients authenticate with
+    """
+
+    def __init__(self, executor, address=None, authkey=None):
+        """
+        Initializes InferenceServer attributes and starts serving.
+
+        :param address: the address to listen on (a free local address by
+                        default)
+        :param authkey: the authentication key (a random one by default)
+        """
+        self.executor = executor
+        self.authkey = authkey or os.urandom(16)
+
+        self._listener = Listener(address, authkey=self.authkey)
+        self.address = self._listener.address
+
+        self._thread = threading.Thread(target=self._accept, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Stops accepting connections."""
+        self._listener.close()
+
+    def __enter__(self):
+        """Returns the server."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the server."""
+        self.close()
+
+    def _accept(self):
+        """Accepts client connections until the server is closed."""
+        while True:
+            try:
+                connection = self._listener.accept()
+            except OSError:
+                return
+
+            threading.Thread(target=self._handle, args=(connection, ),
+                             daemon=True).start()
+
+    def _handle(self, connection):
+        """Serves the requests of a client until it disconnects."""
+        lock = threading.Lock()
+
+        def reply(request_id, future):
+            error = future.exception()
+            response = (request_id, error is None,
+                        future.result() if error is None else error)
+
+            with lock:
+                try:
+                    connection.send(response)
+                except OSError:
+                    pass
+
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+
+                # the client is disconnecting
+                if request is None:
+                    return
+
+                request_id, images, batch_size = request
+
+                self.executor.submit(images, batch_size).add_done_callback(
+                    lambda future, request_id=request_id:
+                    reply(request_id, future))
+
+
+class RemoteExecutor(Executor):
+    """Runs model inference on an InferenceServer.
+
+    Batches are sent as soon as they are submitted, and a background thread
+    resolves their futures as the responses arrive.
+
+    Attributes:
+        address: the address of the server
+    """
+
+    def __init__(self, address, authkey):
+        """Initializes RemoteExecutor attributes and connects."""
+        self.address = address
+
+        self._connection = Client(address, authkey=authkey)
+        self._futures = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        self._thread.start()
+
+    def submit(self, images, batch_size=None):
+        """Sends the images to the server."""
+        future = Future()
+
+        with self._lock:
+            request_id = self._next_id
+            self._next_id += 1
+            self._futures[request_id] = future
+
+            self._connection.send((request_id, np.asarray(images),
+                                   batch_size))
+
+        return future
+
+    def close(self):
+        """Disconnects from the server once it closed the connection."""
+        with self._lock:
+            self._connection.send(None)
+
+        self._thread.join()
+        self._connection.close()
+
+    def _receive(self):
+        """Resolves the futures of answered requests until disconnected."""
+        while True:
+            try:
+                request_id, succeeded, result = self._connection.recv()
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                future = self._futures.pop(request_id)
+
+            if succeeded:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+
+        with self._lock:
+            futures, self._futures = list(self._futures.values()), {}
+
+        for future in futures:
+            future.set_exception(ConnectionError('disconnected from the '
+                                                 'inference server'))
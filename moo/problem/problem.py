@@ -1,4 +1,49 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
+
+import numpy as np
+
+from moo.encodings import DenseEncoding
+from moo.problem.evaluation_cache import EvaluationCache
+
+
+class Evaluation:
+    """A pending evaluation of a population, returned by Problem.submit.
+
+    The results are assigned to the population by result, in the calling
+    thread, once the future is done.
+
+    Attributes:
+        population: the population being evaluated
+        future: a concurrent.futures.Future done once the results are ready
+    """
+
+    def __init__(self, population, future, complete=None):
+        """
+        Initializes Evaluation attributes.
+
+        :param complete: a function assigning the result of the future to
+                         the population or None if nothing is left to do
+        """
+        self.population = population
+        self.future = future
+
+        self._complete = complete
+
+    def done(self):
+        """Returns True if the results are ready."""
+        return self.future.done()
+
+    def result(self):
+        """Waits for the results, assigns them to the population and
+        returns it."""
+        result = self.future.result()
+
+        if self._complete is not None:
+            complete, self._complete = self._complete, None
+            complete(result)
+
+        return self.population
 
 
 class Problem(ABC):
@@ -7,34 +52,67 @@ class Problem(ABC):
     Attributes:
         num_variables: the number of decision space variables
         num_objectives: the number of objectives to optimize
+        num_outputs: the number of model outputs stored per solution
         mins: the lowest possible values of each decision space variable
         maxs: the highest possible values of each decision space variable
         o_mins: the lowest possible values of each objective
         o_mins: the highest possible values of each objective
+        reference_point: the objectives bounding the hypervolume or None
+        cache: an EvaluationCache of model predictions or None if disabled
+        model_calls: the number of model forward passes run so far
+        encoding: the Encoding of the decision variables
     """
 
     def __init__(self, num_variables, num_objectives, mins, maxs,
-                 o_mins=None, o_maxs=None):
+                 o_mins=None, o_maxs=None, cache_size=None, encoding=None):
         """Initializes Problem attributes."""
         self.num_variables = num_variables
         self.num_objectives = num_objectives
+        self.num_outputs = 0
 
         self.mins = mins
         self.maxs = maxs
 
-        self.o_mins = ([float('inf')] * num_objectives
-                       if o_mins is None else o_mins)
-        self.o_maxs = ([float('-inf')] * num_objectives
-                       if o_maxs is None else o_maxs)
+        self.o_mins = np.array([float('inf')] * num_objectives
+                               if o_mins is None else o_mins)
+        self.o_maxs = np.array([float('-inf')] * num_objectives
+                               if o_maxs is None else o_maxs)
+
+        self.reference_point = None
+
+        self.cache = EvaluationCache(cache_size) if cache_size else None
+        self.model_calls = 0
+
+        self.encoding = encoding or DenseEncoding(num_variables, mins, maxs)
 
-    def _update_o_extremes(self, solution):
+    def reset_o_extremes(self):
+        """Resets the o_mins & o_maxs attributes before a new run."""
+        self.o_mins = np.full(self.num_objectives, float('inf'))
+        self.o_maxs = np.full(self.num_objectives, float('-inf'))
+
+    def _update_o_extremes(self, population):
         """Updates the o_mins & o_maxs attributes."""
-        for i, o in enumerate(solution.objectives):
-            if o < self.o_mins[i]:
-                self.o_mins[i] = o
-            elif o > self.o_maxs[i]:
-                self.o_maxs[i] = o
+        if not len(population):
+            return
+
+        self.o_mins = np.minimum(self.o_mins, population.objectives.min(0))
+        self.o_maxs = np.maximum(self.o_maxs, population.objectives.max(0))
 
     @abstractmethod
     def evaluate(self, population, orig_image, label):
         """Evaluates solutions in the given population."""
+
+    def submit(self, population, orig_image, label):
+        """
+        Starts evaluating solutions in the given population without waiting
+        for the results. The population is evaluated synchronously unless
+        the problem overrides this method.
+
+        :return: the pending Evaluation of the population
+        """
+        self.evaluate(population, orig_image, label)
+
+        future = Future()
+        future.set_result(None)
+
+        return Evaluation(population, future)
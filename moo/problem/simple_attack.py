@@ -1,31 +1,16 @@
 import numpy as np
 
-from moo.problem.problem import Problem
+from moo.problem.attack_problem import AttackProblem
 
 
-class SimpleAttack(Problem):
+class SimpleAttack(AttackProblem):
     """
     A MOO problem for simple, non-targeted attacks on image recognition models.
     """
     NUM_OBJECTIVES = 2
+    WORST_PROBABILITY_OBJECTIVES = (1.0, )
+    TARGETED = False
 
-    def __init__(self, model, noise_size):
-        """Initializes AttackProblem attributes."""
-        super().__init__(model.INPUT_SHAPE, self.NUM_OBJECTIVES,
-                         -noise_size, noise_size)
-
-        self.model = model
-
-    def evaluate(self, population, orig_image, label):
-        """Evaluates solutions in the given population."""
-        for solution in population:
-            raw_adv_image = orig_image + solution.variables
-
-            clip_delta = raw_adv_image - np.clip(raw_adv_image, 0, 1)
-            solution.variables -= clip_delta
-
-            predictions = self.model.predict(orig_image + solution.variables)
-            noise_strength = np.sqrt(np.sum(solution.variables ** 2))
-
-            solution.objectives = np.array([predictions[label], noise_strength])
-            self._update_o_extremes(solution)
+    def objectives(self, predictions, noise_strengths, label):
+        """Returns the label probability & noise strength objectives."""
+        return np.column_stack((predictions[:, label], noise_strengths))
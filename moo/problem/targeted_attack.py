@@ -1,29 +1,15 @@
 import numpy as np
 
-from moo.problem.problem import Problem
+from moo.problem.attack_problem import AttackProblem
 
 
-class TargetedAttack(Problem):
+class TargetedAttack(AttackProblem):
     """A MOO problem for targeted attacks on image recognition models."""
     NUM_OBJECTIVES = 2
+    WORST_PROBABILITY_OBJECTIVES = (0.0, )
+    TARGETED = True
 
-    def __init__(self, model, noise_size):
-        """Initializes TargetedAttack attributes."""
-        super().__init__(model.INPUT_SHAPE, self.NUM_OBJECTIVES,
-                         -noise_size, noise_size)
-
-        self.model = model
-
-    def evaluate(self, population, orig_image, label):
-        """Evaluates the given solution."""
-        for solution in population:
-            raw_adv_image = orig_image + solution.variables
-
-            clip_delta = raw_adv_image - np.clip(raw_adv_image, 0, 1)
-            solution.variables -= clip_delta
-
-            predictions = self.model.predict(orig_image + solution.variables)
-            noise_strength = np.sqrt(np.sum(solution.variables ** 2))
-
-            solution.objectives = np.array([-predictions[label], noise_strength])
-            self._update_o_extremes(solution)
+    def objectives(self, predictions, noise_strengths, label):
+        """Returns the negative label probability & noise strength
+        objectives."""
+        return np.column_stack((-predictions[:, label], noise_strengths))
@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class GradientRefinement:
+    """A memetic operator that refines offspring by signed-gradient steps.
+
+    A random subset of the offspring takes a few projected signed-gradient
+    (FGSM/PGD-style) steps that decrease the label probability objective of
+    an AttackProblem, whose model must provide gradients. The gradients of
+    the whole subset are computed in batched passes, and after every step
+    the variables are clipped to the problem's bounds, so the noise size is
+    respected.
+
+    Attributes:
+        fraction: the fraction of offspring to refine
+        steps: the number of gradient steps per refined solution
+        step_size: the size of a step relative to half of the range of a
+                   variable's bounds
+    """
+
+    def __init__(self, fraction=0.1, steps=3, step_size=0.25):
+        """Initializes GradientRefinement attributes."""
+        self.fraction = fraction
+        self.steps = steps
+        self.step_size = step_size
+
+    def refine(self, population, orig_image, label, rng):
+        """
+        Refines a random subset of the given unevaluated population in place.
+
+        :param population: the offspring population
+        :param orig_image: the attacked image
+        :param label: the attacked label
+        :param rng: the np.random.Generator to draw from
+        """
+        problem = population.problem
+        size = min(int(np.ceil(self.fraction * len(population))),
+                   len(population))
+
+        if not size or not self.steps:
+            return
+
+        indices = rng.choice(len(population), size, replace=False)
+        variables = population.variables[indices]
+
+        step = self.step_size * (np.asarray(problem.maxs)
+                                 - np.asarray(problem.mins)) / 2
+
+        for _ in range(self.steps):
+            gradients = problem.gradients(variables, orig_image, label)
+
+            variables -= (step * np.sign(gradients)).astype(variables.dtype)
+            np.clip(variables, problem.mins, problem.maxs, out=variables)
+
+        population.variables[indices] = variables
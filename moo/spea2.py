@@ -1,10 +1,11 @@
 import numpy as np
 
 from moo import operators
-from moo.solution.spea2_solution import SPEA2Solution
+from moo.algorithm import Algorithm, PhaseTimer
+from moo.population.spea2_population import SPEA2Population
 
 
-class SPEA2:
+class SPEA2(Algorithm):
     """An implementation of SPEA-II.
 
     Zitzler, Eckart, Marco Laumanns, and Lothar Thiele. "SPEA2: Improving the
@@ -15,101 +16,181 @@ class SPEA2:
         pop_size: the size of the population
         archive_size: the size of the archive
         max_iterations: the maximum number of algorithm iterations
+        observers: a list of Observers notified about runs & generations
+        rng: the np.random.Generator used for all random decisions
+        stopping_criteria: a list of StoppingCriteria that can end a run early
+        archive_front: if True, runs return every non-dominated solution
+                       evaluated during the run
+        refinement: a GradientRefinement applied to offspring or None
+        tile_size: the number of rows of the domination & distance matrices
+                   computed at once, or None to compute whole matrices
     """
 
-    def __init__(self, problem, pop_size, archive_size, max_iterations):
+    def __init__(self, problem, pop_size, archive_size, max_iterations,
+                 observers=(), rng=None, stopping_criteria=(),
+                 archive_front=False, refinement=None, tile_size=None):
         """Initializes SPEA2 attributes."""
-        self.problem = problem
+        super().__init__(problem, pop_size, max_iterations, observers, rng,
+                         stopping_criteria, archive_front, refinement,
+                         tile_size)
 
-        self.pop_size = pop_size
         self.archive_size = archive_size
-        self.max_iterations = max_iterations
 
-    def run(self, orig_image, label):
-        """Executes the algorithm."""
-        population = self.initialize()
-        archive = []
+    def iterate(self, orig_image, label):
+        """Executes the algorithm step by step."""
+        self._start(orig_image, label)
+
+        resumed = self._resume(population=SPEA2Population,
+                               archive=SPEA2Population)
+
+        if resumed is None:
+            population = self.initialize()
+            archive = SPEA2Population(self.problem)
+
+            iteration = 0
+        else:
+            iteration, populations = resumed
+            population, archive = (populations['population'],
+                                   populations['archive'])
 
-        iteration = 0
         while iteration < self.max_iterations:
-            # print(f'i={iteration}')
+            timer = PhaseTimer()
 
-            self.problem.evaluate(population, orig_image, label)
+            with timer.phase('evaluation'):
+                yield from self._evaluate(population)
 
-            union = population + archive
-            self.fitness_assignment(union)
+            with timer.phase('fitness'):
+                union = population + archive
+                distances = self.fitness_assignment(union)
 
-            archive = self.environmental_selection(union)
-            population = operators.reproduce(archive)
+            with timer.phase('selection'):
+                archive = self.environmental_selection(union, distances)
 
-            iteration += 1
+            with timer.phase('reproduction'):
+                population = operators.reproduce(archive, self.rng)
+
+            self._refine(population, orig_image, label, timer)
 
-        nondominated = [s for s in archive if s.fitness < 1]
+            if self._end_generation(iteration, timer,
+                                    archive[archive.fitness < 1], label,
+                                    archive_size=len(archive)):
+                break
+
+            immigrants = self._take_immigrants()
+
+            if immigrants is not None:
+                archive = archive + immigrants
+
+            self._save_checkpoint(iteration, population=population,
+                                  archive=archive)
+
+            iteration += 1
 
-        return nondominated
+        return self._finish(self._result(archive))
 
     def initialize(self):
         """Returns the initial population."""
-        return [SPEA2Solution(self.problem) for _ in range(self.pop_size)]
+        return SPEA2Population(self.problem, self.pop_size, rng=self.rng)
 
     def fitness_assignment(self, union):
-        """Assigns fitness values to all solutions in the given union."""
+        """
+        Assigns fitness values to all solutions in the given union.
+
+        If tiles are enabled, the distance matrix is never stored whole - the
+        densities are computed from one tile of distances at a time.
+
+        :param union: the union of the population and the archive
+        :return: the matrix of objectives distances between solutions, or
+                 None if tiles are enabled
+        """
+        dominates, _ = self._domination(union)
+        distances = union.distance_matrix() if self.tile_size is None else None
+
         k = int(np.sqrt(len(union)))
+        raw_fitness = np.zeros(len(union), dtype='int64')
 
-        for solution in union:
-            solution.strength = 0
-            distances = []
+        for rows, tile in self._domination_rows(dominates, None, len(union)):
+            union.strength[rows] = tile.sum(axis=1)
 
-            for candidate in union:
-                distances.append(np.linalg.norm(
-                    solution.objectives - candidate.objectives))
+        for rows, tile in self._domination_rows(dominates, None, len(union)):
+            raw_fitness += union.strength[rows] @ tile
 
-                if solution.dominates(candidate):
-                    candidate.dominators.append(solution)
-                    solution.strength += 1
+        for rows in self._tiles(None, len(union)):
+            tile = (union.distance_matrix(rows) if distances is None
+                    else distances[rows])
+            union.density[rows] = 1.0 / (np.partition(tile, k)[:, k] + 2.0)
 
-            distances.sort()
-            solution.density = 1.0 / (distances[k] + 2.0)
+        union.raw_fitness[:] = raw_fitness
+        union.fitness[:] = union.raw_fitness + union.density
 
-        for solution in union:
-            solution.raw_fitness = sum(d.strength for d in solution.dominators)
-            solution.fitness = solution.raw_fitness + solution.density
-            solution.dominators = []
+        return distances
 
-    def environmental_selection(self, union):
+    def environmental_selection(self, union, distances):
         """Applies environmental selection to the given union and returns
         the obtained new archive."""
-        next_archive = [s for s in union if s.fitness < 1]
+        nondominated = np.flatnonzero(union.fitness < 1)
+        next_archive = union[nondominated]
 
         if len(next_archive) < self.archive_size:
-            union.sort(reverse=True)
-            
-            for solution in union:
-                if solution.fitness >= 1:
-                    next_archive.append(solution)
+            order = np.argsort(union.fitness, kind='stable')
+            dominated = order[union.fitness[order] >= 1]
+            fill_count = self.archive_size - len(next_archive)
 
-                if len(next_archive) >= self.archive_size:
-                    break
+            next_archive += union[dominated[:fill_count]]
 
         elif len(next_archive) > self.archive_size:
-            self.archive_truncation(next_archive)
+            next_archive = self.archive_truncation(
+                next_archive, None if distances is None
+                else distances[np.ix_(nondominated, nondominated)])
 
         return next_archive
 
-    def archive_truncation(self, archive):
-        """Truncates the given archive to archive_size."""
-        while len(archive) > self.archive_size:
-            k = int(np.sqrt(len(archive)))
+    def archive_truncation(self, archive, distances):
+        """
+        Returns the given archive truncated to archive_size.
+
+        The solution with the smallest distance to its k-th nearest neighbor
+        is removed until the archive is small enough. After each removal, the
+        k-th distances are recomputed only for solutions whose k-th nearest
+        neighbor might have been the removed solution.
+
+        :param archive: the archive to truncate
+        :param distances: the matrix of objectives distances between solutions
+                          or None to compute the needed distances in tiles
+        :return: the truncated archive
+        """
+        remaining = np.arange(len(archive))
+        kth_distances = np.zeros(len(archive), dtype='float32')
+
+        k = None
+        affected = remaining
+
+        while len(remaining) > self.archive_size:
+            if k != int(np.sqrt(len(remaining))):
+                k = int(np.sqrt(len(remaining)))
+                affected = remaining
+
+            for rows in self._tiles(affected, len(affected)):
+                kth_distances[rows] = np.partition(self._distance_block(
+                    archive, distances, rows, remaining), k)[:, k]
+
+            archive.density[remaining] = kth_distances[remaining]
+
+            order = np.argsort(-kth_distances[remaining], kind='stable')
+            removed, remaining = remaining[order][-1], remaining[order][:-1]
 
-            for solution in archive:
-                distances = []
+            affected = remaining[self._distance_block(
+                archive, distances, remaining, [removed])[:, 0]
+                <= kth_distances[remaining]]
 
-                for other in archive:
-                    distances.append(np.linalg.norm(
-                        solution.objectives - other.objectives))
+        return archive[remaining]
 
-                distances.sort()
-                solution.density = distances[k]
+    @staticmethod
+    def _distance_block(archive, distances, rows, columns):
+        """Returns the distances between the given rows & columns of the
+        archive, taken from the distance matrix or computed if it is
+        None."""
+        if distances is None:
+            return archive.distance_matrix(rows, columns)
 
-            archive.sort(key=lambda s: s.density, reverse=True)
-            archive.pop()
+        return distances[np.ix_(rows, columns)]
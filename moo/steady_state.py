@@ -0,0 +1,444 @@
+from abc import abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import ClassVar
+
+import numpy as np
+
+from moo import operators
+from moo.algorithm import Algorithm, PhaseTimer
+from moo.nsga2 import NSGA2
+from moo.population.nsga2_population import NSGA2Population
+from moo.population.spea2_population import SPEA2Population
+from moo.spea2 import SPEA2
+
+
+def _dominated_by_any(first, second):
+    """Returns a boolean array telling which rows of the second objectives
+    matrix are dominated by any row of the first one."""
+    not_worse = np.all(first[:, None] <= second[None, :], axis=2)
+    better = np.any(first[:, None] < second[None, :], axis=2)
+
+    return np.any(not_worse & better, axis=0)
+
+
+def _dominance(objectives, solution):
+    """
+    Compares the given objectives with the objectives of a solution.
+
+    :return: a tuple of boolean arrays telling which rows of the objectives
+             dominate the solution and which ones the solution dominates
+    """
+    dominators = (np.all(objectives <= solution, axis=1)
+                  & np.any(objectives < solution, axis=1))
+    dominated = (np.all(solution <= objectives, axis=1)
+                 & np.any(solution < objectives, axis=1))
+
+    return dominators, dominated
+
+
+class SteadyStateAlgorithm(Algorithm):
+    """The base class for steady-state variants of MOO algorithms.
+
+    Instead of evaluating a whole offspring population per generation, the
+    algorithm keeps max_pending small batches of offspring submitted to the
+    problem at once. As soon as any batch is evaluated, its solutions are
+    inserted one by one into the population, whose ranking is updated
+    incrementally, and a new batch is bred from the updated population. With
+    an AttackProblem using an executor, the batches are predicted
+    concurrently, so the workers never wait for the slowest batch of a
+    generation. Without an executor, batches are evaluated synchronously.
+
+    Every pop_size insertions count as a generation, which is reported to
+    observers, checked by the stopping criteria and checkpointed. In-flight
+    offspring are not checkpointed, and the order in which concurrent batches
+    finish (so the result of a run) may vary between runs.
+
+    Attributes:
+        offspring_size: the number of offspring per submitted batch
+        max_pending: the max number of batches evaluated concurrently
+    """
+    POPULATION: ClassVar[type]
+
+    def run(self, orig_image, label):
+        """Executes the algorithm."""
+        self._start(orig_image, label)
+
+        resumed = self._resume(population=self.POPULATION)
+
+        if resumed is None:
+            population = self.initialize()
+            population = self._collect(self._submit(population, orig_image,
+                                                    label))
+            iteration = 0
+        else:
+            iteration, populations = resumed
+            population = populations['population']
+
+        population = self._prepare(population, resumed is not None)
+
+        pending = deque()
+        inserted = 0
+
+        while iteration < self.max_iterations:
+            timer = PhaseTimer()
+
+            while inserted < self.pop_size:
+                while len(pending) < self.max_pending:
+                    with timer.phase('reproduction'):
+                        offspring = operators.reproduce(
+                            population, self.rng, self.offspring_size)
+
+                    self._refine(offspring, orig_image, label, timer)
+
+                    with timer.phase('evaluation'):
+                        pending.append(self._submit(offspring, orig_image,
+                                                    label))
+
+                with timer.phase('evaluation'):
+                    wait([evaluation.future for evaluation in pending],
+                         return_when=FIRST_COMPLETED)
+
+                    # finished batches are inserted in submission order
+                    finished = [evaluation for evaluation in pending
+                                if evaluation.done()]
+                    pending = deque(evaluation for evaluation in pending
+                                    if evaluation not in finished)
+
+                for evaluation in finished:
+                    with timer.phase('evaluation'):
+                        offspring = self._collect(evaluation)
+
+                    with timer.phase('insertion'):
+                        population = self._insert_all(population, offspring)
+
+                    inserted += len(offspring)
+
+            inserted -= self.pop_size
+
+            if self._end_generation(iteration, timer, self._front(population),
+                                    label, **self._stats(population)):
+                break
+
+            immigrants = self._take_immigrants()
+
+            if immigrants is not None:
+                population = self._insert_all(population, immigrants)
+
+            self._save_checkpoint(iteration, population=population)
+
+            iteration += 1
+
+        return self._finish(self._result(population))
+
+    def iterate(self, orig_image, label):
+        """Executes the algorithm. The offspring are evaluated asynchronously
+        by the problem, so no population is yielded."""
+        yield from ()
+        return self.run(orig_image, label)
+
+    def _submit(self, population, orig_image, label):
+        """Submits the given population to the problem and counts the model
+        calls."""
+        model_calls = self.problem.model_calls
+
+        evaluation = self.problem.submit(population, orig_image, label)
+        self.model_calls += self.problem.model_calls - model_calls
+
+        return evaluation
+
+    def _collect(self, evaluation):
+        """Returns the evaluated population of the given finished evaluation
+        and counts its evaluations."""
+        population = evaluation.result()
+        self._count_evaluations(population)
+
+        return population
+
+    def _insert_all(self, population, solutions):
+        """Inserts the given solutions one by one into the population and
+        returns the updated population."""
+        for i in range(len(solutions)):
+            population = self._insert(population, solutions[i:i + 1])
+
+        return population
+
+    @abstractmethod
+    def _prepare(self, population, resumed):
+        """
+        Returns the survivors of the given evaluated population and sets up
+        the state of incremental insertions.
+
+        :param population: the initial population or the population restored
+                           from a checkpoint
+        :param resumed: if True, the population was restored, so it already
+                        consists of survivors
+        """
+
+    @abstractmethod
+    def _insert(self, population, solution):
+        """Returns the population updated by inserting the given evaluated
+        solution, which replaces the worst solution if the population is
+        full."""
+
+    @abstractmethod
+    def _front(self, population):
+        """Returns the current non-dominated set."""
+
+    def _stats(self, population):
+        """Returns the algorithm-specific statistics of a generation."""
+        return {}
+
+
+class SteadyStateNSGA2(SteadyStateAlgorithm, NSGA2):
+    """A steady-state variant of NSGA-II.
+
+    Every inserted solution competes with the population like in a
+    generation of NSGA-II with a single offspring - the worst solution by
+    rank & crowding distance is removed. The ranks are updated by the
+    efficient non-domination level update, which only compares the solution
+    with the levels it can affect, and the crowding distances are recomputed
+    only for the changed levels (or for all of them when the objective
+    extremes change).
+
+    Li, Ke, et al. "Efficient non-domination level update approach for
+    steady-state evolutionary multiobjective optimization." COIN Report
+    2014014 (2014).
+
+    Attributes:
+        offspring_size: the number of offspring per submitted batch
+        max_pending: the max number of batches evaluated concurrently
+    """
+    POPULATION = NSGA2Population
+
+    def __init__(self, problem, pop_size, max_iterations, observers=(),
+                 rng=None, stopping_criteria=(), archive_front=False,
+                 refinement=None, offspring_size=1, max_pending=1,
+                 tile_size=None):
+        """Initializes SteadyStateNSGA2 attributes.
+
+        :param tile_size: the number of rows of the domination matrix of the
+                          initial sort computed at once, or None to compute
+                          the whole matrix
+        """
+        super().__init__(problem, pop_size, max_iterations, observers, rng,
+                         stopping_criteria, archive_front, refinement,
+                         tile_size)
+
+        self.offspring_size = offspring_size
+        self.max_pending = max_pending
+
+        self._objective_ranges = None
+
+    def _prepare(self, population, resumed):
+        """Sorts the given population."""
+        self.fast_non_dominated_sort(population)
+        self._objective_ranges = self.problem.o_maxs - self.problem.o_mins
+
+        return population
+
+    def _insert(self, population, solution):
+        """Inserts the given solution, updating ranks incrementally."""
+        union = population + solution
+        objectives = union.objectives
+        rank = union.rank
+        new = len(population)
+
+        dominators, dominated = _dominance(objectives[:new], objectives[new])
+        rank[new] = rank[:new][dominators].max() + 1 if dominators.any() else 0
+
+        # the dominated solutions of the new solution's level move to the
+        # next level, pushing down the solutions they dominate in turn
+        level = rank[new]
+        changed = {level}
+        moving = np.flatnonzero(dominated & (rank[:new] == level))
+
+        while len(moving):
+            level += 1
+            candidates = np.flatnonzero(rank[:new] == level)
+
+            rank[moving] = level
+            changed.add(level)
+
+            moving = candidates[_dominated_by_any(objectives[moving],
+                                                  objectives[candidates])]
+
+        if len(union) > self.pop_size:
+            last_front = np.flatnonzero(rank == rank.max())
+            self.crowding_distance_assignment(union, last_front)
+
+            order = np.argsort(-union.crowding_distance[last_front],
+                               kind='stable')
+            union = union[np.delete(np.arange(len(union)),
+                                    last_front[order[-1]])]
+
+        ranges = self.problem.o_maxs - self.problem.o_mins
+
+        if not np.array_equal(ranges, self._objective_ranges):
+            self._objective_ranges = ranges
+            changed = range(union.rank.max() + 1)
+        else:
+            changed.add(union.rank.max())
+
+        for level in changed:
+            front = np.flatnonzero(union.rank == level)
+
+            if len(front):
+                self.crowding_distance_assignment(union, front)
+
+        return union
+
+    def _front(self, population):
+        """Returns the solutions of the first front."""
+        return population[population.rank == 0]
+
+    def _stats(self, population):
+        """Returns the sizes of the fronts."""
+        return {'front_sizes': np.bincount(population.rank).tolist()}
+
+
+class SteadyStateSPEA2(SteadyStateAlgorithm, SPEA2):
+    """A steady-state variant of SPEA-II.
+
+    The initial population is reduced to an archive by environmental
+    selection, and offspring are bred from the archive. Every inserted
+    solution competes with the archive like in a generation of SPEA-II with
+    a single solution - if the archive overflows, the most crowded
+    non-dominated solution is truncated, or the solution with the worst
+    fitness is removed if the archive holds dominated solutions. The
+    domination & distance matrices of the archive are kept between
+    insertions, so the strengths & raw fitness values are updated from the
+    new solution's row of the domination matrix, and only the densities are
+    recomputed.
+
+    Attributes:
+        offspring_size: the number of offspring per submitted batch
+        max_pending: the max number of batches evaluated concurrently
+    """
+    POPULATION = SPEA2Population
+
+    def __init__(self, problem, pop_size, archive_size, max_iterations,
+                 observers=(), rng=None, stopping_criteria=(),
+                 archive_front=False, refinement=None, offspring_size=1,
+                 max_pending=1):
+        """Initializes SteadyStateSPEA2 attributes."""
+        super().__init__(problem, pop_size, archive_size, max_iterations,
+                         observers, rng, stopping_criteria, archive_front,
+                         refinement)
+
+        self.offspring_size = offspring_size
+        self.max_pending = max_pending
+
+        self._dominates = None
+        self._distances = None
+
+    def _prepare(self, population, resumed):
+        """Returns the archive selected from the given population, or the
+        restored archive as is, since selecting it again would reorder it."""
+        archive = population
+
+        if not resumed:
+            archive = self.environmental_selection(
+                population, self.fitness_assignment(population))
+
+        self._distances = self.fitness_assignment(archive)
+        self._dominates = archive.domination_matrix()
+
+        return archive
+
+    def _insert(self, archive, solution):
+        """Inserts the given solution, updating fitness values
+        incrementally."""
+        union = archive + solution
+        objectives = union.objectives
+        new = len(archive)
+
+        dominators, dominated = _dominance(objectives[:new], objectives[new])
+
+        dominates = np.zeros((new + 1, new + 1), dtype=bool)
+        dominates[:new, :new] = self._dominates
+        dominates[:new, new] = dominators
+        dominates[new, :new] = dominated
+
+        # computed like in distance_matrix, so the distances are identical
+        squared_distances = np.zeros(new, dtype='float32')
+
+        for objective in objectives.T:
+            squared_distances += (objective[:new] - objective[new]) ** 2
+
+        distances = np.zeros((new + 1, new + 1), dtype='float32')
+        distances[:new, :new] = self._distances
+        distances[:new, new] = distances[new, :new] = np.sqrt(
+            squared_distances)
+
+        # the dominators of the new solution gain strength, which adds to the
+        # raw fitness of every solution they dominate
+        union.strength[:new] += dominators
+        union.strength[new] = np.count_nonzero(dominated)
+        union.raw_fitness[:new] += (dominators.astype('int64')
+                                    @ self._dominates
+                                    + union.strength[new] * dominated)
+        union.raw_fitness[new] = union.strength[:new][dominators].sum()
+
+        self._assign_density(union, distances)
+
+        if len(union) > self.archive_size:
+            union, dominates, distances = self._remove(
+                union, self._worst(union, distances), dominates, distances)
+            self._assign_density(union, distances)
+
+        self._dominates = dominates
+        self._distances = distances
+
+        return union
+
+    def _worst(self, union, distances):
+        """Returns the index of the solution removed by environmental
+        selection from the given union of an archive and one solution."""
+        nondominated = np.flatnonzero(union.fitness < 1)
+
+        if len(nondominated) > self.archive_size:
+            k = int(np.sqrt(len(nondominated)))
+            kth_distances = np.partition(
+                distances[np.ix_(nondominated, nondominated)], k)[:, k]
+            order = np.argsort(-kth_distances, kind='stable')
+
+            return nondominated[order[-1]]
+
+        return np.argsort(union.fitness, kind='stable')[-1]
+
+    @staticmethod
+    def _remove(union, removed, dominates, distances):
+        """Removes a solution from the given union, undoing its contribution
+        to the strengths & raw fitness values of the others.
+
+        :return: the union, domination matrix and distance matrix without
+                 the removed solution
+        """
+        removers = dominates[:, removed]
+
+        union.raw_fitness -= (removers.astype('int64') @ dominates
+                              + union.strength[removed] * dominates[removed])
+        union.strength -= removers
+
+        kept = np.delete(np.arange(len(union)), removed)
+
+        return (union[kept], dominates[np.ix_(kept, kept)],
+                distances[np.ix_(kept, kept)])
+
+    @staticmethod
+    def _assign_density(union, distances):
+        """Assigns the densities & fitness values of the given union, like
+        fitness_assignment."""
+        k = int(np.sqrt(len(union)))
+
+        union.density[:] = 1.0 / (np.partition(distances, k)[:, k] + 2.0)
+        union.fitness[:] = union.raw_fitness + union.density
+
+    def _front(self, archive):
+        """Returns the non-dominated solutions of the archive."""
+        return archive[archive.fitness < 1]
+
+    def _stats(self, archive):
+        """Returns the size of the archive."""
+        return {'archive_size': len(archive)}
@@ -0,0 +1,141 @@
+import time
+from collections import deque
+
+
+class StoppingCriterion:
+    """The base class for criteria that end MOO algorithm runs early.
+
+    Criteria are checked after every generation, in the order in which they
+    were given to the algorithm. The REASON of the first criterion that is
+    met is recorded as the algorithm's stop_reason.
+    """
+    REASON = None
+
+    def start(self, algorithm):
+        """Resets the state of the criterion before a new run."""
+
+    def get_state(self):
+        """Returns the JSON-serializable state of the criterion in the
+        current run, saved in checkpoints."""
+        return None
+
+    def set_state(self, state):
+        """Restores a state returned by get_state."""
+
+    def should_stop(self, algorithm, front, label):
+        """
+        Returns True if the run should stop.
+
+        :param algorithm: the running algorithm
+        :param front: the current non-dominated set
+        :param label: the label of the current run
+        """
+        return False
+
+
+class AttackSucceeded(StoppingCriterion):
+    """Stops once the non-dominated set contains a successful attack whose
+    noise strength is not higher than a threshold.
+
+    The noise strength is expected to be the last objective.
+
+    Attributes:
+        max_noise_strength: the highest acceptable noise strength
+    """
+    REASON = 'attack_succeeded'
+
+    def __init__(self, max_noise_strength):
+        """Initializes AttackSucceeded attributes."""
+        self.max_noise_strength = max_noise_strength
+
+    def should_stop(self, algorithm, front, label):
+        """Returns True if a successful attack with low enough noise was
+        found."""
+        if not len(front):
+            return False
+
+        weak = front.objectives[:, -1] <= self.max_noise_strength
+        successful = algorithm.problem.is_successful(front.predictions[weak],
+                                                     label)
+
+        return bool(successful.any())
+
+
+class HypervolumeStagnation(StoppingCriterion):
+    """Stops once the hypervolume of the non-dominated set has not improved
+    by more than a relative tolerance over a window of generations.
+
+    Attributes:
+        window: the number of generations to look back
+        tolerance: the smallest relative improvement considered progress
+    """
+    REASON = 'hypervolume_stagnation'
+
+    def __init__(self, window, tolerance=1e-4):
+        """Initializes HypervolumeStagnation attributes."""
+        self.window = window
+        self.tolerance = tolerance
+        self._history = deque(maxlen=window + 1)
+
+    def start(self, algorithm):
+        """Forgets the hypervolumes of the previous run."""
+        self._history.clear()
+
+    def get_state(self):
+        """Returns the hypervolumes within the window."""
+        return list(self._history)
+
+    def set_state(self, state):
+        """Restores the hypervolumes within the window."""
+        self._history.clear()
+        self._history.extend(state)
+
+    def should_stop(self, algorithm, front, label):
+        """Returns True if the hypervolume stagnated over the window."""
+        self._history.append(algorithm.hypervolume(front))
+
+        if len(self._history) <= self.window:
+            return False
+
+        oldest, latest = self._history[0], self._history[-1]
+
+        # a zero hypervolume means no solution improves on the reference
+        # point yet, which is a lack of progress the window cannot measure
+        if latest <= 0:
+            return False
+
+        return latest - oldest <= self.tolerance * latest
+
+
+class TimeBudget(StoppingCriterion):
+    """Stops once a run has taken longer than a wall-clock budget.
+
+    Attributes:
+        seconds: the wall-clock budget of a run in seconds
+    """
+    REASON = 'time_budget'
+
+    def __init__(self, seconds):
+        """Initializes TimeBudget attributes."""
+        self.seconds = seconds
+
+    def should_stop(self, algorithm, front, label):
+        """Returns True if the run exceeded the budget."""
+        return time.perf_counter() - algorithm.start_time >= self.seconds
+
+
+class EvaluationBudget(StoppingCriterion):
+    """Stops once a run has used up a budget of model evaluations.
+
+    Attributes:
+        max_evaluations: the max number of solutions evaluated in a run
+    """
+    REASON = 'evaluation_budget'
+
+    def __init__(self, max_evaluations):
+        """Initializes EvaluationBudget attributes."""
+        self.max_evaluations = max_evaluations
+
+    def should_stop(self, algorithm, front, label):
+        """Returns True if the run used up the budget."""
+        return algorithm.evaluations >= self.max_evaluations
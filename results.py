@@ -0,0 +1,211 @@
+import argparse
+import csv
+import glob
+import os
+
+import numpy as np
+
+from moo.checkpoint import save_npz
+
+INDEX_FILENAME = 'data.csv'
+SHARD_PATTERN = 'shard{:05d}.npz'
+
+
+class ResultStore:
+    """Stores attack results as compressed .npz shards indexed by a CSV file.
+
+    Results are buffered in memory and written in bulk. Once shard_size
+    solutions are buffered, their perturbations & objectives are saved to
+    the next shard together with the original images of their samples, and
+    their CSV lines - extended with the shard & row of each solution - are
+    appended to the index. All solutions of a sample end up in one shard.
+
+    Attributes:
+        directory: the directory containing the index & shards
+        shard_size: the min number of solutions per shard
+        on_flush: a function called with the indices of the samples whose
+                  results were written, or None
+    """
+
+    def __init__(self, directory, header, shard_size=1000, append=False,
+                 on_flush=None):
+        """
+        Initializes ResultStore attributes.
+
+        :param directory: the directory containing the index & shards
+        :param header: the names of the CSV line fields
+        :param shard_size: the min number of solutions per shard
+        :param append: if True, results are appended to an existing store
+                       instead of replacing it
+        :param on_flush: a function called with the indices of the samples
+                         whose results were written
+        """
+        self.directory = directory
+        self.shard_size = shard_size
+        self.on_flush = on_flush
+
+        os.makedirs(directory, exist_ok=True)
+
+        # an interrupted run may leave an index without a header behind
+        index_path = os.path.join(directory, INDEX_FILENAME)
+        append = append and os.path.exists(index_path) \
+            and os.path.getsize(index_path) > 0
+
+        if not append:
+            for path in shard_paths(directory):
+                os.remove(path)
+
+        self._shard = len(shard_paths(directory))
+        self._index_file = open(index_path, 'a' if append else 'w',
+                                newline='')
+        self._index = csv.writer(self._index_file)
+
+        if not append:
+            self._index.writerow(list(header) + ['shard', 'row'])
+            self._index_file.flush()
+
+        self._samples = []
+        self._orig_images = {}
+        self._lines = []
+        self._perturbations = []
+        self._objectives = []
+        self._sample_indices = []
+
+    def add(self, sample_idx, orig_image, rows):
+        """
+        Buffers the results of an attacked sample, writing them if the
+        buffer holds enough solutions.
+
+        :param sample_idx: the index of the sample
+        :param orig_image: the attacked image
+        :param rows: a list of (CSV line, perturbation, objectives) tuples,
+                     one per solution, or None if the sample was skipped
+        """
+        self._samples.append(sample_idx)
+
+        if rows:
+            self._orig_images[sample_idx] = orig_image
+
+            for line, perturbation, objectives in rows:
+                self._lines.append(line)
+                self._perturbations.append(perturbation)
+                self._objectives.append(objectives)
+                self._sample_indices.append(sample_idx)
+
+        if len(self._lines) >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered results to a new shard & the index."""
+        if self._lines:
+            save_npz(os.path.join(self.directory,
+                                  SHARD_PATTERN.format(self._shard)),
+                     compressed=True,
+                     perturbations=np.array(self._perturbations,
+                                            dtype='float32'),
+                     objectives=np.array(self._objectives, dtype='float32'),
+                     sample_idx=np.array(self._sample_indices),
+                     orig_sample_idx=np.array(list(self._orig_images)),
+                     orig_images=np.array(list(self._orig_images.values())))
+
+            self._index.writerows(line + [self._shard, row]
+                                  for row, line in enumerate(self._lines))
+            self._index_file.flush()
+
+            self._shard += 1
+
+        if self.on_flush is not None and self._samples:
+            self.on_flush(self._samples)
+
+        self._samples = []
+        self._orig_images = {}
+        self._lines = []
+        self._perturbations = []
+        self._objectives = []
+        self._sample_indices = []
+
+    def close(self):
+        """Writes the buffered results and closes the index."""
+        self.flush()
+        self._index_file.close()
+
+
+def shard_paths(directory):
+    """Returns the sorted paths of the shards in the given directory."""
+    return sorted(glob.glob(os.path.join(directory, 'shard*.npz')))
+
+
+def load_results(directory):
+    """
+    Loads all results stored in the given directory.
+
+    :return: a dict of the perturbations, objectives & sample indices of all
+             solutions, and the original images of all samples by index
+    """
+    columns = {'perturbations': [], 'objectives': [], 'sample_idx': []}
+    orig_images = {}
+
+    for path in shard_paths(directory):
+        with np.load(path) as shard:
+            for column, arrays in columns.items():
+                arrays.append(shard[column])
+
+            orig_images.update(zip(shard['orig_sample_idx'].tolist(),
+                                   shard['orig_images']))
+
+    results = {column: np.concatenate(arrays) if arrays else np.empty(0)
+               for column, arrays in columns.items()}
+    results['orig_images'] = orig_images
+
+    return results
+
+
+def save_image(array, filename):
+    """Saves the given array as an image."""
+    from PIL import Image
+
+    array = (array * 255).reshape(28, 28).astype('uint8')
+    Image.fromarray(array, 'L').save(filename)
+
+
+def export_images(directory, output_dir=None):
+    """
+    Saves the original & adversarial images of all results stored in the
+    given directory as PNG files.
+
+    :param directory: the directory containing the index & shards
+    :param output_dir: the directory to save images to (the store directory
+                       by default)
+    """
+    output_dir = output_dir or directory
+    os.makedirs(output_dir, exist_ok=True)
+
+    for path in shard_paths(directory):
+        with np.load(path) as shard:
+            orig_images = dict(zip(shard['orig_sample_idx'].tolist(),
+                                   shard['orig_images']))
+            adv_indices = dict.fromkeys(orig_images, 0)
+
+            for sample_idx, orig_image in orig_images.items():
+                save_image(orig_image, os.path.join(
+                    output_dir, f'sample{sample_idx}_orig.png'))
+
+            for sample_idx, perturbation in zip(shard['sample_idx'].tolist(),
+                                                shard['perturbations']):
+                adv_idx = adv_indices[sample_idx]
+                adv_indices[sample_idx] += 1
+
+                save_image(orig_images[sample_idx] + perturbation,
+                           os.path.join(output_dir,
+                                        f'sample{sample_idx}_{adv_idx}.png'))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Exports stored attack results as PNG images.')
+    parser.add_argument('directory', help='the results directory')
+    parser.add_argument('--output', default=None,
+                        help='the directory to save images to')
+
+    args = parser.parse_args()
+    export_images(args.directory, args.output)
@@ -0,0 +1,406 @@
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from moo import operators
+from moo.archive import FrontArchive
+from moo.encodings import DctEncoding, GridEncoding, SparseEncoding
+from moo.indicators import hypervolume, igd, spacing, spread
+from moo.nsga2 import NSGA2
+from moo.population.nsga2_population import NSGA2Population
+from moo.population.spea2_population import SPEA2Population
+from moo.problem.improved_targeted_attack import ImprovedTargetedAttack
+from moo.problem.problem import Problem
+from moo.problem.simple_attack import SimpleAttack
+from moo.problem.targeted_attack import TargetedAttack
+from moo.refinement import GradientRefinement
+from moo.spea2 import SPEA2
+from moo.steady_state import SteadyStateNSGA2, SteadyStateSPEA2
+from stub_model import StubModel
+
+ATTACKS = {'simple_attack': SimpleAttack, 'targeted_attack': TargetedAttack,
+           'improved_attack': ImprovedTargetedAttack}
+
+ENCODINGS = {'dense': lambda shape: None,
+             'sparse': lambda shape: SparseEncoding(shape, 0.1, 20),
+             'grid': lambda shape: GridEncoding(shape, 0.1, 7),
+             'dct': lambda shape: DctEncoding(shape, 0.1, 7)}
+
+ALGORITHMS = {'nsga2': lambda problem, size, iterations, seed:
+              NSGA2(problem, size, iterations, rng=seed),
+              'spea2': lambda problem, size, iterations, seed:
+              SPEA2(problem, size, size, iterations, rng=seed)}
+
+STEADY_STATE_ALGORITHMS = {
+    'nsga2': lambda problem, size, iterations, seed:
+    SteadyStateNSGA2(problem, size, iterations, rng=seed,
+                     offspring_size=size // 10),
+    'spea2': lambda problem, size, iterations, seed:
+    SteadyStateSPEA2(problem, size, size, iterations, rng=seed,
+                     offspring_size=size // 10)}
+
+TILE_SIZE = 256
+
+GRIDS = {
+    'full': {'pop_sizes': [100, 500, 1000], 'num_variables': [2, 784],
+             'num_objectives': [2, 3], 'iterations': 20},
+    'quick': {'pop_sizes': [100, 200], 'num_variables': [2, 784],
+              'num_objectives': [2, 3], 'iterations': 5},
+}
+
+
+class BenchmarkProblem(Problem):
+    """A problem with random objectives used to benchmark the MOO core."""
+
+    def __init__(self, num_variables, num_objectives):
+        """Initializes BenchmarkProblem attributes."""
+        super().__init__(num_variables, num_objectives, -1.0, 1.0)
+
+    def evaluate(self, population, orig_image, label):
+        """Assigns objectives on a random linear front to the population."""
+        first = np.random.uniform(size=len(population))
+        rest = np.random.uniform(
+            size=(len(population), self.num_objectives - 2))
+
+        population.objectives[:] = np.column_stack((first, 1 - first, rest))
+        self._update_o_extremes(population)
+
+
+def evaluated(population_class, pop_size, num_variables, num_objectives):
+    """Returns an evaluated population of the given class."""
+    problem = BenchmarkProblem(num_variables, num_objectives)
+    population = population_class(problem, pop_size)
+    problem.evaluate(population, None, None)
+
+    return population
+
+
+def benchmark_cases(grid, seed):
+    """Yields (name, params, setup) triples, where setup returns a function
+    whose execution is timed."""
+    pop_sizes = grid['pop_sizes']
+    sort_grid = list(itertools.product(pop_sizes, grid['num_objectives']))
+
+    for pop_size, num_objectives in sort_grid:
+        params = {'pop_size': pop_size, 'num_objectives': num_objectives}
+
+        def sort_setup(pop_size=pop_size, num_objectives=num_objectives):
+            population = evaluated(NSGA2Population, 2 * pop_size, 1,
+                                   num_objectives)
+            nsga2 = NSGA2(population.problem, pop_size, 0)
+            return lambda: nsga2.fast_non_dominated_sort(population)
+
+        def crowding_setup(pop_size=pop_size, num_objectives=num_objectives):
+            population = evaluated(NSGA2Population, pop_size, 1,
+                                   num_objectives)
+            nsga2 = NSGA2(population.problem, pop_size, 0)
+            front = np.arange(pop_size)
+            return lambda: nsga2.crowding_distance_assignment(population,
+                                                              front)
+
+        def fitness_setup(pop_size=pop_size, num_objectives=num_objectives):
+            union = evaluated(SPEA2Population, 2 * pop_size, 1,
+                              num_objectives)
+            spea2 = SPEA2(union.problem, pop_size, pop_size, 0)
+            return lambda: spea2.fitness_assignment(union)
+
+        def truncation_setup(pop_size=pop_size,
+                             num_objectives=num_objectives):
+            archive = evaluated(SPEA2Population, 2 * pop_size, 1,
+                                num_objectives)
+            spea2 = SPEA2(archive.problem, pop_size, pop_size, 0)
+            distances = archive.distance_matrix()
+            return lambda: spea2.archive_truncation(archive, distances)
+
+        def tiled_sort_setup(pop_size=pop_size,
+                             num_objectives=num_objectives):
+            population = evaluated(NSGA2Population, 2 * pop_size, 1,
+                                   num_objectives)
+            nsga2 = NSGA2(population.problem, pop_size, 0,
+                          tile_size=TILE_SIZE)
+            return lambda: nsga2.fast_non_dominated_sort(population)
+
+        def tiled_fitness_setup(pop_size=pop_size,
+                                num_objectives=num_objectives):
+            union = evaluated(SPEA2Population, 2 * pop_size, 1,
+                              num_objectives)
+            spea2 = SPEA2(union.problem, pop_size, pop_size, 0,
+                          tile_size=TILE_SIZE)
+            return lambda: spea2.environmental_selection(
+                union, spea2.fitness_assignment(union))
+
+        yield 'fast_non_dominated_sort', params, sort_setup
+        yield 'crowding_distance_assignment', params, crowding_setup
+        yield 'fitness_assignment', params, fitness_setup
+        yield 'archive_truncation', params, truncation_setup
+        yield 'tiled_sort', params, tiled_sort_setup
+        yield 'tiled_fitness', params, tiled_fitness_setup
+
+    for pop_size, num_objectives in itertools.product(
+            pop_sizes, grid['num_objectives']):
+        params = {'pop_size': pop_size, 'num_objectives': num_objectives}
+
+        def archive_setup(pop_size=pop_size, num_objectives=num_objectives):
+            population = evaluated(NSGA2Population, 10 * pop_size, 2,
+                                   num_objectives)
+            return lambda: FrontArchive(population.problem).update(population)
+
+        yield 'front_archive', params, archive_setup
+
+        def hypervolume_setup(pop_size=pop_size,
+                              num_objectives=num_objectives):
+            objectives = evaluated(NSGA2Population, pop_size, 1,
+                                   num_objectives).objectives
+            reference_point = np.full(num_objectives, 1.1)
+            return lambda: hypervolume(objectives, reference_point)
+
+        def indicators_setup(pop_size=pop_size,
+                             num_objectives=num_objectives):
+            objectives = evaluated(NSGA2Population, pop_size, 1,
+                                   num_objectives).objectives
+            reference_front = evaluated(NSGA2Population, pop_size, 1,
+                                        num_objectives).objectives
+            return lambda: (igd(objectives, reference_front),
+                            spread(objectives, reference_front),
+                            spacing(objectives))
+
+        yield 'hypervolume', params, hypervolume_setup
+        yield 'indicators', params, indicators_setup
+
+    for pop_size, num_variables in itertools.product(pop_sizes,
+                                                     grid['num_variables']):
+        params = {'pop_size': pop_size, 'num_variables': num_variables}
+
+        def reproduce_setup(pop_size=pop_size, num_variables=num_variables):
+            population = evaluated(NSGA2Population, pop_size, num_variables, 2)
+            NSGA2(population.problem, pop_size, 0).fast_non_dominated_sort(
+                population)
+            rng = np.random.default_rng(seed)
+            return lambda: operators.reproduce(population, rng)
+
+        yield 'reproduce', params, reproduce_setup
+
+    model = StubModel()
+    orig_image = np.random.RandomState(0).uniform(
+        size=model.INPUT_SHAPE).astype('float32')
+
+    for attack, pop_size in itertools.product(ATTACKS, pop_sizes):
+        params = {'attack': attack, 'pop_size': pop_size}
+
+        def evaluate_setup(attack=attack, pop_size=pop_size):
+            problem = ATTACKS[attack](model, 0.1)
+            population = NSGA2Population(problem, pop_size)
+            return lambda: problem.evaluate(population, orig_image, 3)
+
+        yield 'evaluate', params, evaluate_setup
+
+    for algorithm, attack in itertools.product(ALGORITHMS, ATTACKS):
+        params = {'algorithm': algorithm, 'attack': attack,
+                  'pop_size': pop_sizes[0], 'iterations': grid['iterations']}
+
+        def run_setup(algorithm=algorithm, attack=attack):
+            problem = ATTACKS[attack](model, 0.1)
+            instance = ALGORITHMS[algorithm](problem, pop_sizes[0],
+                                             grid['iterations'], seed)
+            return lambda: instance.run(orig_image, 3)
+
+        yield 'run', params, run_setup
+
+    for encoding in ENCODINGS:
+        params = {'encoding': encoding, 'pop_size': pop_sizes[0],
+                  'iterations': grid['iterations']}
+
+        def encoding_setup(encoding=encoding):
+            problem = SimpleAttack(model, 0.1, encoding=ENCODINGS[encoding](
+                model.INPUT_SHAPE))
+            instance = NSGA2(problem, pop_sizes[0], grid['iterations'],
+                             rng=seed)
+            return lambda: instance.run(orig_image, 3)
+
+        yield 'encoding', params, encoding_setup
+
+    for attack in ATTACKS:
+        params = {'attack': attack, 'pop_size': pop_sizes[0],
+                  'iterations': grid['iterations']}
+
+        def refinement_setup(attack=attack):
+            problem = ATTACKS[attack](model, 0.1)
+            instance = NSGA2(problem, pop_sizes[0], grid['iterations'],
+                             rng=seed, refinement=GradientRefinement())
+            return lambda: instance.run(orig_image, 3)
+
+        yield 'refinement', params, refinement_setup
+
+    for algorithm in STEADY_STATE_ALGORITHMS:
+        params = {'algorithm': algorithm, 'pop_size': pop_sizes[0],
+                  'iterations': grid['iterations']}
+
+        def steady_state_setup(algorithm=algorithm):
+            problem = SimpleAttack(model, 0.1)
+            instance = STEADY_STATE_ALGORITHMS[algorithm](
+                problem, pop_sizes[0], grid['iterations'], seed)
+            return lambda: instance.run(orig_image, 3)
+
+        yield 'steady_state', params, steady_state_setup
+
+
+def measure(setup, repeats, seed, min_time=0.0):
+    """
+    Returns the wall times of repeated executions of a benchmark case.
+    The global random generator is reseeded before every setup.
+
+    :param repeats: the min number of executions
+    :param min_time: the min total time of the executions, so short cases
+                     are repeated until their timing noise averages out
+    """
+    times = []
+
+    while len(times) < repeats or sum(times) < min_time:
+        np.random.seed(seed)
+
+        function = setup()
+
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return times
+
+
+def measure_memory(setup, seed):
+    """Returns the peak memory in bytes allocated by an execution of a
+    benchmark case, as traced by tracemalloc."""
+    np.random.seed(seed)
+
+    function = setup()
+
+    tracemalloc.start()
+
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit():
+    """Returns the hash of the current git commit or None."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                              capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def case_key(record):
+    """Returns a key identifying the benchmark case of a record."""
+    return record['benchmark'], json.dumps(record['params'], sort_keys=True)
+
+
+def compare(records, baseline_path, threshold):
+    """
+    Prints records whose min time exceeds the baseline's by more than the
+    given factor. The min of the repeated executions is compared as it is
+    the least affected by noise (interruptions only slow executions down).
+
+    :return: the number of regressions
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = {case_key(record): record
+                    for record in map(json.loads, baseline_file)}
+
+    regressions = 0
+
+    for record in records:
+        reference = baseline.get(case_key(record))
+
+        if reference is None:
+            continue
+
+        ratio = record['min_s'] / reference['min_s']
+
+        if ratio > threshold:
+            regressions += 1
+            print(f'REGRESSION {record["benchmark"]} {record["params"]}: '
+                  f'{reference["min_s"]:.6f}s -> {record["min_s"]:.6f}s '
+                  f'({ratio:.2f}x)', file=sys.stderr)
+
+    return regressions
+
+
+def parse_args():
+    """Parses the command-line arguments."""
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--grid', choices=GRIDS, default='quick',
+                        help='the grid of benchmark parameters')
+    parser.add_argument('--benchmarks', nargs='+', default=None,
+                        help='the names of benchmarks to run (default: all)')
+    parser.add_argument('--rounds', type=int, default=5,
+                        help='the number of interleaved rounds timing every '
+                             'case')
+    parser.add_argument('--repeats', type=int, default=1,
+                        help='the min number of timed executions per case '
+                             'and round')
+    parser.add_argument('--min-time', type=float, default=1.0,
+                        help='the min total seconds of timed executions per '
+                             'case, spread across the rounds')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='the seed used for every case')
+    parser.add_argument('--memory', action='store_true',
+                        help='also measure the peak memory of every case')
+    parser.add_argument('--output', default=None,
+                        help='a JSON lines file to write the results to')
+    parser.add_argument('--compare', default=None,
+                        help='a JSON lines file with baseline results')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='the slowdown factor reported as a regression')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    commit = git_commit()
+    records = []
+
+    output_file = open(args.output, 'w') if args.output else sys.stdout
+
+    cases = [(name, params, setup) for name, params, setup
+             in benchmark_cases(GRIDS[args.grid], args.seed)
+             if not args.benchmarks or name in args.benchmarks]
+
+    # Every round times every case, so a burst of load on the machine slows
+    # down a single round of a case rather than all of its executions
+    times = [[] for _ in cases]
+
+    for _ in range(args.rounds):
+        for case_times, (_, _, setup) in zip(times, cases):
+            case_times += measure(setup, args.repeats, args.seed,
+                                  args.min_time / args.rounds)
+
+    for (name, params, setup), case_times in zip(cases, times):
+        record = {'benchmark': name, 'params': params, 'commit': commit,
+                  'seed': args.seed, 'repeats': len(case_times),
+                  'min_s': min(case_times),
+                  'median_s': float(np.median(case_times))}
+
+        if args.memory:
+            record['peak_bytes'] = measure_memory(setup, args.seed)
+
+        records.append(record)
+        output_file.write(json.dumps(record) + '\n')
+        output_file.flush()
+
+    if args.output:
+        output_file.close()
+
+    if args.compare and compare(records, args.compare, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,115 @@
+import argparse
+import time
+
+import numpy as np
+
+from moo.nsga2 import NSGA2
+from moo.population.nsga2_population import NSGA2Population
+from moo.problem.problem import Problem
+
+
+class SortProblem(Problem):
+    """A problem with precomputed objectives used to benchmark sorting."""
+
+    def __init__(self, num_objectives):
+        """Initializes SortProblem attributes."""
+        super().__init__(1, num_objectives, 0.0, 1.0)
+
+    def evaluate(self, population, orig_image, label):
+        """Leaves the precomputed objectives as they are."""
+
+
+def reference_sort(objectives):
+    """
+    Returns the ranks obtained by the original pure Python non-dominated sort
+    of the given objectives.
+
+    :param objectives: a list of objectives tuples
+    :return: a list of ranks
+    """
+    def dominates(first, second):
+        is_strictly_better = False
+
+        for o1, o2 in zip(first, second):
+            if o1 > o2:
+                return False
+            if o1 < o2:
+                is_strictly_better = True
+
+        return is_strictly_better
+
+    dominates_lists = [[] for _ in objectives]
+    dominated_by = [0] * len(objectives)
+    ranks = [-1] * len(objectives)
+    current_front = []
+
+    for i, solution in enumerate(objectives):
+        for j, candidate in enumerate(objectives):
+            if dominates(solution, candidate):
+                dominates_lists[i].append(j)
+            elif dominates(candidate, solution):
+                dominated_by[i] += 1
+
+        if dominated_by[i] == 0:
+            current_front.append(i)
+            ranks[i] = 0
+
+    front_index = 0
+    while current_front:
+        next_front = []
+
+        for i in current_front:
+            for j in dominates_lists[i]:
+                dominated_by[j] -= 1
+
+                if dominated_by[j] == 0:
+                    next_front.append(j)
+                    ranks[j] = front_index + 1
+
+        current_front = next_front
+        front_index += 1
+
+    return ranks
+
+
+def parse_args():
+    """Parses the command-line arguments."""
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=[200, 1000, 5000],
+                        help='the population sizes to benchmark')
+    parser.add_argument('--objectives', type=int, default=2,
+                        help='the number of objectives')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='the seed used to generate objectives')
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    rng = np.random.RandomState(args.seed)
+
+    problem = SortProblem(args.objectives)
+    nsga2 = NSGA2(problem, 0, 0)
+
+    print('size,reference_s,vectorized_s,speedup')
+
+    for size in args.sizes:
+        population = NSGA2Population(problem, size)
+        population.objectives[:] = rng.uniform(size=(size, args.objectives))
+        problem._update_o_extremes(population)
+
+        start = time.perf_counter()
+        ranks = reference_sort(population.objectives.tolist())
+        reference_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        nsga2.fast_non_dominated_sort(population)
+        vectorized_time = time.perf_counter() - start
+
+        assert np.array_equal(population.rank, ranks)
+
+        print(f'{size},{reference_time:.4f},{vectorized_time:.4f},'
+              f'{reference_time / vectorized_time:.1f}')
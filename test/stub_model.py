@@ -0,0 +1,39 @@
+import numpy as np
+
+
+class StubModel:
+    """A stand-in for AttackModel that needs no weights or Keras.
+
+    Predictions are the softmax of a fixed random linear map of the input,
+    so they are deterministic and cheap to compute.
+    """
+    INPUT_SHAPE = (28, 28, 1)
+    NUM_OUTPUTS = 10
+
+    def __init__(self, seed=0):
+        """Initializes StubModel attributes."""
+        rng = np.random.RandomState(seed)
+        self.weights = rng.normal(
+            scale=0.1, size=(int(np.prod(self.INPUT_SHAPE)), self.NUM_OUTPUTS)
+        ).astype('float32')
+
+    def predict(self, data):
+        """Returns the predictions obtained for the given data."""
+        return self.predict_batch(np.array([data]))[0]
+
+    def predict_batch(self, data, batch_size=None):
+        """Returns the predictions obtained for the given batch of data."""
+        logits = np.asarray(data).reshape(len(data), -1) @ self.weights
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def gradient_batch(self, data, output_weights, batch_size=None):
+        """Returns the gradients of a weighted sum of the predictions with
+        respect to the given batch of data."""
+        data = np.asarray(data)
+        predictions = self.predict_batch(data)
+        logit_gradients = predictions * (
+            output_weights - (predictions @ output_weights)[:, None])
+
+        return (logit_gradients @ self.weights.T).reshape(data.shape)
@@ -0,0 +1,36 @@
+import numpy as np
+
+from models.convolutional_model import ConvolutionalModel
+from models.simple_model import SimpleModel
+from moo.encodings import DctEncoding, GridEncoding, SparseEncoding
+
+NOISE_SIZE = 0.1
+POP_SIZE = 16
+
+
+def check(encoding, rng):
+    """Decodes random solutions of the given encoding & checks the shapes and
+    bounds of the perturbations and of their variable gradients."""
+    variables = rng.uniform(encoding.mins, encoding.maxs,
+                            (POP_SIZE, *encoding.num_variables))
+    perturbations = encoding.decode(variables)
+
+    assert perturbations.shape == (POP_SIZE, *encoding.input_shape)
+    assert np.abs(perturbations).max() <= NOISE_SIZE
+
+    gradients = rng.normal(size=perturbations.shape)
+    variable_gradients = encoding.variable_gradients(variables, gradients)
+
+    assert variable_gradients.shape == variables.shape
+
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+
+    for model in [SimpleModel, ConvolutionalModel]:
+        for encoding_class in [SparseEncoding, GridEncoding, DctEncoding]:
+            encoding = encoding_class(model.INPUT_SHAPE, NOISE_SIZE, 7)
+            check(encoding, rng)
+
+            print(f'{model.__name__} {encoding_class.__name__}: '
+                  f'{encoding.input_shape} as {encoding.image_shape} OK')
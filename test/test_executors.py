@@ -0,0 +1,44 @@
+import time
+
+import numpy as np
+
+from moo.nsga2 import NSGA2
+from moo.problem.executors import (BatchingExecutor, InferenceServer,
+                                   RemoteExecutor, SerialExecutor,
+                                   ThreadExecutor)
+from moo.problem.simple_attack import SimpleAttack
+from stub_model import StubModel
+
+
+def attack(executor):
+    """Runs a short attack evaluated by the given executor and returns the
+    final front & the wall time."""
+    problem = SimpleAttack(model, 0.1, executor=executor)
+    start = time.perf_counter()
+    front = NSGA2(problem, 100, 20, rng=0).run(orig_image, label)
+
+    return front, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    model = StubModel()
+    orig_image = np.random.RandomState(0).uniform(
+        size=model.INPUT_SHAPE).astype('float32')
+    label = int(np.argmax(model.predict(orig_image)))
+
+    reference, wall_time = attack(None)
+    print(f'direct: {wall_time:.3f}s')
+
+    batching = BatchingExecutor(model)
+
+    with SerialExecutor(model) as serial, \
+            ThreadExecutor(model, 4) as threads, \
+            InferenceServer(batching) as server, \
+            RemoteExecutor(server.address, server.authkey) as remote:
+        for name, executor in [('serial', serial), ('threads', threads),
+                               ('batching', batching), ('server', remote)]:
+            front, wall_time = attack(executor)
+            same = np.allclose(front.objectives, reference.objectives)
+            print(f'{name}: {wall_time:.3f}s, same front: {same}')
+
+    batching.close()
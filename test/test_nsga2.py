@@ -9,12 +9,12 @@ if __name__ == '__main__':
     pop_size = 100
     max_iter = 100
 
-    fronts = NSGA2(problem, pop_size, max_iter).run(None, None)
+    front = NSGA2(problem, pop_size, max_iter).run(None, None)
 
-    print(f'\nPrinting objectives for front 0 with {len(fronts[0])} elements')
+    print(f'\nPrinting objectives for front 0 with {len(front)} elements')
 
     for i in range(problem.num_objectives):
         print(f'\nObjective {i}:')
 
-        for solution in fronts[0]:
-            print(f'{solution.objectives[i]}')
+        for objective in front.objectives[:, i]:
+            print(f'{objective}')
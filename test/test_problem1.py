@@ -1,6 +1,4 @@
-import numpy as np
-
-from problem.problem import Problem
+from moo.problem.problem import Problem
 
 
 class TestProblem1(Problem):
@@ -22,7 +20,6 @@ class TestProblem1(Problem):
                          self.MINS, self.MAXS)
 
     def evaluate(self, population, orig_image, label):
-        """Evaluates the given solution."""
-        for solution in population:
-            solution.objectives = np.array([v * v for v in solution.variables])
-            self._update_o_extremes(solution)
+        """Evaluates solutions in the given population."""
+        population.objectives[:] = population.variables ** 2
+        self._update_o_extremes(population)
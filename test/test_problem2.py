@@ -1,6 +1,6 @@
 import numpy as np
 
-from problem.problem import Problem
+from moo.problem.problem import Problem
 
 
 class TestProblem2(Problem):
@@ -20,8 +20,7 @@ class TestProblem2(Problem):
                          self.MINS, self.MAXS)
 
     def evaluate(self, population, orig_image, label):
-        """Evaluates the given solution."""
-        for solution in population:
-            x1, x2 = solution.variables
-            solution.objectives = np.array([x1, (1.0 + x2) / x1])
-            self._update_o_extremes(solution)
+        """Evaluates solutions in the given population."""
+        x1, x2 = population.variables.T
+        population.objectives[:] = np.column_stack((x1, (1.0 + x2) / x1))
+        self._update_o_extremes(population)
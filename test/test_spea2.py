@@ -1,4 +1,4 @@
-from spea2 import SPEA2
+from moo.spea2 import SPEA2
 # from test_problem1 import TestProblem1
 from test_problem2 import TestProblem2
 
@@ -17,5 +17,5 @@ if __name__ == '__main__':
     for i in range(problem.num_objectives):
         print(f'\nObjective {i}:')
 
-        for solution in archive:
-            print(f'{solution.objectives[i]}')
+        for objective in archive.objectives[:, i]:
+            print(f'{objective}')
@@ -0,0 +1,161 @@
+import os
+import tempfile
+
+import numpy as np
+
+from moo import operators
+from moo.checkpoint import Checkpoint
+from moo.nsga2 import NSGA2
+from moo.population.nsga2_population import NSGA2Population
+from moo.population.spea2_population import SPEA2Population
+from moo.problem.problem import Problem
+from moo.problem.simple_attack import SimpleAttack
+from moo.spea2 import SPEA2
+from moo.steady_state import SteadyStateNSGA2, SteadyStateSPEA2
+from stub_model import StubModel
+
+
+class TiedProblem(Problem):
+    """A 3-objective problem with rounded objectives, so solutions often tie
+    in ranks, crowding distances & densities."""
+
+    def __init__(self):
+        """Initializes TiedProblem attributes."""
+        super().__init__(3, 3, [0.0] * 3, [1.0] * 3)
+
+    def evaluate(self, population, orig_image, label):
+        """Evaluates solutions in the given population."""
+        x1, x2, x3 = population.variables.T
+        population.objectives[:] = np.round(
+            np.column_stack((x1, x2, 1.5 - x1 - x2 + x3)), 1)
+        self._update_o_extremes(population)
+
+
+def evaluated(population, problem):
+    """Returns the given population evaluated by the problem."""
+    problem.evaluate(population, None, None)
+
+    return population
+
+
+def variable_set(population):
+    """Returns the set of decision variables of the given population."""
+    return sorted(map(tuple, population.variables.tolist()))
+
+
+def check_nsga2_insertion():
+    """Checks that every insertion of SteadyStateNSGA2 selects the same
+    solutions as a generation of NSGA2 on the union, with the ranks &
+    crowding distances of a full sort."""
+    rng = np.random.default_rng(0)
+    problem = TiedProblem()
+    algorithm = SteadyStateNSGA2(problem, 30, 1)
+    reference = NSGA2(problem, 30, 1)
+
+    population = algorithm._prepare(
+        evaluated(NSGA2Population(problem, 30, rng=rng), problem), False)
+
+    for _ in range(300):
+        solution = evaluated(operators.reproduce(population, rng, 1), problem)
+
+        union = population + solution
+        expected = reference.build_population(
+            union, reference.fast_non_dominated_sort(union))
+
+        population = algorithm._insert(population, solution)
+        assert variable_set(population) == variable_set(expected)
+
+        sorted_population = population[np.arange(len(population))]
+        reference.fast_non_dominated_sort(sorted_population)
+        assert np.array_equal(sorted_population.rank, population.rank)
+        assert np.array_equal(sorted_population.crowding_distance,
+                              population.crowding_distance)
+
+
+def check_spea2_insertion(pop_size, archive_size):
+    """Checks that every insertion of SteadyStateSPEA2 selects the same
+    solutions as a generation of SPEA2 on the union, with the fitness values
+    of a full fitness assignment."""
+    rng = np.random.default_rng(0)
+    problem = TiedProblem()
+    algorithm = SteadyStateSPEA2(problem, pop_size, archive_size, 1)
+    reference = SPEA2(problem, pop_size, archive_size, 1)
+
+    archive = algorithm._prepare(
+        evaluated(SPEA2Population(problem, pop_size, rng=rng), problem),
+        False)
+    assert len(archive) == archive_size
+
+    for _ in range(300):
+        solution = evaluated(operators.reproduce(archive, rng, 1), problem)
+
+        union = archive + solution
+        expected = reference.environmental_selection(
+            union, reference.fitness_assignment(union))
+
+        archive = algorithm._insert(archive, solution)
+        assert variable_set(archive) == variable_set(expected)
+
+        assigned = archive[np.arange(len(archive))]
+        reference.fitness_assignment(assigned)
+        assert np.array_equal(assigned.fitness, archive.fitness)
+
+
+def check_small_archive():
+    """Runs SteadyStateSPEA2 with an archive smaller than the population, so
+    the initial population is truncated."""
+    algorithm = SteadyStateSPEA2(SimpleAttack(model, 0.1), 60, 3, 20, rng=0,
+                                 offspring_size=5)
+    front = algorithm.run(orig_image, label)
+
+    assert 0 < len(front) <= 3
+
+
+def check_resume(create):
+    """Checks that a run interrupted after 5 of 10 iterations and resumed
+    from its checkpoint returns the same front as an uninterrupted run.
+
+    :param create: a function returning the algorithm to run, given its
+                   max number of iterations
+    """
+    front = create(10).run(orig_image, label)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'checkpoint.npz')
+
+        interrupted = create(5)
+        interrupted.checkpoint = Checkpoint(path)
+        interrupted.run(orig_image, label)
+
+        resumed = create(10)
+        resumed.checkpoint = Checkpoint(path)
+        resumed_front = resumed.run(orig_image, label)
+
+    assert np.array_equal(resumed_front.variables, front.variables)
+    assert np.array_equal(resumed_front.objectives, front.objectives)
+
+
+if __name__ == '__main__':
+    model = StubModel()
+    orig_image = np.random.RandomState(0).uniform(
+        size=model.INPUT_SHAPE).astype('float32')
+    label = int(np.argmax(model.predict(orig_image)))
+
+    checks = {
+        'nsga2_insertion': check_nsga2_insertion,
+        'spea2_insertion': lambda: check_spea2_insertion(30, 30),
+        'spea2_insertion_small_archive':
+            lambda: check_spea2_insertion(30, 10),
+        'small_archive': check_small_archive,
+        'nsga2_resume': lambda: check_resume(
+            lambda iterations: SteadyStateNSGA2(
+                SimpleAttack(model, 0.1), 20, iterations, rng=0,
+                offspring_size=4)),
+        'spea2_resume': lambda: check_resume(
+            lambda iterations: SteadyStateSPEA2(
+                SimpleAttack(model, 0.1), 20, 10, iterations, rng=0,
+                offspring_size=4))}
+
+    for name, check in checks.items():
+        check()
+        print(f'{name}: OK')
@@ -1,7 +1,8 @@
-import keras
+import os
+
 import numpy as np
-from keras.datasets import mnist
-from matplotlib import pyplot as plt
+
+MNIST_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.keras', 'datasets')
 
 
 def load_mnist(input_shape, num_outputs=10):
@@ -12,6 +13,8 @@ def load_mnist(input_shape, num_outputs=10):
     :param num_outputs: the number of model outputs
     :return: the MNIST training & test sets with corresponding labels
     """
+    from keras.datasets import mnist
+
     (x_train, y_train), (x_test, y_test) = mnist.load_data()
 
     x_train = x_train.reshape(x_train.shape[0], *input_shape).astype('float32')
@@ -20,36 +23,117 @@ def load_mnist(input_shape, num_outputs=10):
     x_train /= 255
     x_test /= 255
 
-    y_train = keras.utils.to_categorical(y_train, num_outputs)
-    y_test = keras.utils.to_categorical(y_test, num_outputs)
+    y_train = np.eye(num_outputs, dtype='float32')[y_train]
+    y_test = np.eye(num_outputs, dtype='float32')[y_test]
 
     return x_train, y_train, x_test, y_test
 
 
-def sample_choice(x, y, labels, samples_per_label, seed=None):
+def load_mnist_test(input_shape, cache_dir=MNIST_CACHE_DIR):
+    """
+    Loads the MNIST test set as memory-mapped arrays.
+
+    On the first call, the test set is read from the Keras MNIST archive
+    (downloaded by Keras if missing), scaled to [0, 1] and cached as .npy
+    files in cache_dir. Later calls only memory-map the cached files, so no
+    data is read until samples are accessed.
+
+    :param input_shape: a tuple describing the shape of the model's input layer
+    :param cache_dir: the directory containing the cached .npy files
+    :return: the MNIST test set and the corresponding integer labels
+    """
+    x_path = os.path.join(cache_dir, 'mnist_x_test.npy')
+    y_path = os.path.join(cache_dir, 'mnist_y_test.npy')
+
+    if not (os.path.exists(x_path) and os.path.exists(y_path)):
+        _cache_mnist_test(cache_dir, x_path, y_path)
+
+    x_test = np.load(x_path, mmap_mode='r')
+    y_test = np.load(y_path, mmap_mode='r')
+
+    return x_test.reshape(len(x_test), *input_shape), y_test
+
+
+def _cache_mnist_test(cache_dir, x_path, y_path):
+    """Caches the scaled MNIST test set & labels as .npy files."""
+    archive_path = os.path.join(cache_dir, 'mnist.npz')
+
+    if os.path.exists(archive_path):
+        with np.load(archive_path) as archive:
+            x_test, y_test = archive['x_test'], archive['y_test']
+    else:
+        from keras.datasets import mnist
+        x_test, y_test = mnist.load_data()[1]
+
+    x_test = x_test.reshape(len(x_test), -1)
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    for path, array in ((x_path, (x_test / 255).astype('float32')),
+                        (y_path, y_test.astype('int64'))):
+        temp_path = f'{path}.{os.getpid()}.tmp'
+
+        with open(temp_path, 'wb') as temp_file:
+            np.save(temp_file, array)
+
+        os.replace(temp_path, path)
+
+
+def label_indices(y, labels):
+    """
+    Builds a per-label index of the given labels with a single sort.
+
+    :param y: the integer labels of the samples
+    :param labels: a collection of the labels to index
+    :return: a dict mapping every label to the ascending indices of its
+             samples
     """
-    Chooses samples_per_label random samples for each label in labels.
+    y = np.asarray(y)
+    order = np.argsort(y, kind='stable')
+    sorted_labels = y[order]
+
+    return {label: order[np.searchsorted(sorted_labels, label, 'left'):
+                         np.searchsorted(sorted_labels, label, 'right')]
+            for label in labels}
+
+
+def stratified_samples(x, y, labels, samples_per_label=None, seed=None):
+    """
+    Lazily yields samples_per_label random samples of every label in labels,
+    drawn without replacement.
+
+    The samples are chosen from a per-label index built once, and the labels
+    take turns, so every prefix of the stream is balanced. Images are only
+    read from x (e.g. a memory-mapped test set) when they are yielded.
 
     :param x: the samples to choose from
-    :param y: the corresponding labels
-    :param labels: a collection of all possible labels
-    :param samples_per_label: the number of samples to choose for each label
+    :param y: the corresponding integer labels
+    :param labels: a collection of the labels to choose samples of
+    :param samples_per_label: the number of samples to choose for each
+                              label, or None for all samples of the labels
     :param seed: the seed to use for choosing random samples
-    :return: num_samples random samples with the corresponding labels
+    :return: a generator of (index, image, label) tuples, where index is the
+             position of the sample in x
     """
-    rng = np.random if seed is None else np.random.RandomState(seed)
-    rand_x, rand_y = [], []
+    labels = list(labels)
+    rng = np.random.default_rng(seed)
+    chosen = []
+
+    for label, indices in label_indices(y, labels).items():
+        size = len(indices) if samples_per_label is None else samples_per_label
 
-    for label in labels:
-        for _ in range(samples_per_label):
-            index = rng.randint(0, len(x))
-            while y[index] != label:
-                index = rng.randint(0, len(x))
+        if size > len(indices):
+            raise ValueError(f'cannot choose {size} samples of label {label} '
+                             f'with only {len(indices)} samples')
 
-            rand_x.append(x[index])
-            rand_y.append(label)
+        chosen.append((label, rng.choice(indices, size, replace=False)))
 
-    return rand_x, rand_y
+    for position in range(max((len(indices) for _, indices in chosen),
+                              default=0)):
+        for label, indices in chosen:
+            if position < len(indices):
+                index = int(indices[position])
+                yield index, np.asarray(x[index]), label
 
 
 def plot_results(history):
@@ -58,6 +142,8 @@ def plot_results(history):
 
     :param history: a History object containing loss and metrics values
     """
+    from matplotlib import pyplot as plt
+
     plt.plot(history.history['accuracy'])
     plt.plot(history.history['val_accuracy'])
     plt.title('model accuracy')